@@ -4,18 +4,32 @@ Helper script to trigger OpenAI's video generation endpoint from the CLI.
 
 Usage:
   python scripts/run_openai_video.py --pet-name Luna --pet-bio "Playful beagle..."
+  python scripts/run_openai_video.py --batch roster.csv --output-dir clips --concurrency 4
+
+Batch files are CSV (with a header row) or JSONL with `pet_name` and `pet_bio` fields, plus
+optional `id`, `prompt` and `output`. Progress is checkpointed so a rerun skips finished clips
+and resumes polling jobs that were already submitted.
 """
 
 import argparse
+import asyncio
+import csv
+import glob
+import json
 import os
+import random
+import re
 import sys
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 import requests
 
 OPENAI_VIDEOS_URL = "https://api.openai.com/v1/videos"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_RETRIES = 4
+ACTIVE_STATUSES = {"queued", "processing", "starting", "in_progress"}
 
 
 def resolve_key() -> str:
@@ -65,30 +79,247 @@ def fetch_job(api_key: str, job_id: str) -> dict:
 
 
 def download_video(api_key: str, job_id: str, output_path: Path) -> None:
-  response = requests.get(
-    f"{OPENAI_VIDEOS_URL}/{job_id}/content",
-    headers={"Authorization": f"Bearer {api_key}"},
-    timeout=120,
-    stream=True,
+  """Stream the clip to `<output>.<job_id>.part`, resuming with a Range request after a dropped connection."""
+  partial = output_path.with_name(f"{output_path.name}.{job_id}.part")
+  # a partial left by an earlier job for the same output holds a different clip
+  for stale in output_path.parent.glob(f"{glob.escape(output_path.name)}.*.part"):
+    if stale != partial:
+      stale.unlink()
+  for attempt in range(DOWNLOAD_RETRIES + 1):
+    offset = partial.stat().st_size if partial.exists() else 0
+    headers = {"Authorization": f"Bearer {api_key}"}
+    if offset:
+      headers["Range"] = f"bytes={offset}-"
+    try:
+      with requests.get(
+        f"{OPENAI_VIDEOS_URL}/{job_id}/content",
+        headers=headers,
+        timeout=120,
+        stream=True,
+      ) as response:
+        if offset and response.status_code == 416:
+          # nothing left to fetch: the previous attempt already had every byte
+          break
+        response.raise_for_status()
+        # a 200 means the server ignored the Range header, so start over
+        mode = "ab" if offset and response.status_code == 206 else "wb"
+        with partial.open(mode) as file:
+          for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            if chunk:
+              file.write(chunk)
+      break
+    except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+      if attempt == DOWNLOAD_RETRIES:
+        raise
+      time.sleep(2**attempt)
+  partial.replace(output_path)
+
+
+def slugify(value: str) -> str:
+  return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or "pet"
+
+
+def load_roster(path: Path) -> List[dict]:
+  with path.open(newline="", encoding="utf-8") as file:
+    if path.suffix.lower() in {".jsonl", ".ndjson"}:
+      rows = [json.loads(line) for line in file if line.strip()]
+    else:
+      rows = list(csv.DictReader(file))
+
+  pets = []
+  seen = set()
+  for row in rows:
+    name = (row.get("pet_name") or row.get("name") or "").strip()
+    bio = (row.get("pet_bio") or row.get("bio") or "").strip()
+    if not name or not bio:
+      print(f"Skipping roster row without pet_name/pet_bio: {row}")
+      continue
+    key = str(row.get("id") or slugify(name))
+    if key in seen:
+      raise RuntimeError(f"Duplicate pet id '{key}' in {path}; add an id column to disambiguate.")
+    seen.add(key)
+    pets.append({"key": key, "name": name, "bio": bio, "prompt": row.get("prompt"), "output": row.get("output")})
+  return pets
+
+
+class Checkpoint:
+  """JSON file of per-pet job state, rewritten atomically after every change."""
+
+  def __init__(self, path: Path) -> None:
+    self.path = path
+    self.entries: Dict[str, dict] = json.loads(path.read_text()) if path.exists() else {}
+
+  def get(self, key: str) -> dict:
+    return self.entries.get(key, {})
+
+  def update(self, key: str, **fields) -> None:
+    self.entries.setdefault(key, {}).update(fields)
+    staged = self.path.with_name(self.path.name + ".tmp")
+    staged.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+    staged.replace(self.path)
+
+
+class JobPoller:
+  """Polls every outstanding job from one loop, backing off per job while it stays busy."""
+
+  def __init__(self, api_key: str, base_interval: float, max_interval: float, timeout: float) -> None:
+    self.api_key = api_key
+    self.base_interval = base_interval
+    self.max_interval = max_interval
+    self.timeout = timeout
+    self.jobs: Dict[str, dict] = {}
+    self.task: Optional[asyncio.Task] = None
+    self.wake: Optional[asyncio.Event] = None
+
+  async def wait(self, job_id: str) -> dict:
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    now = loop.time()
+    self.jobs[job_id] = {
+      "future": future,
+      "next": now + self.base_interval,
+      "interval": self.base_interval,
+      "deadline": now + self.timeout,
+    }
+    if self.task is None or self.task.done():
+      self.wake = asyncio.Event()
+      self.task = asyncio.create_task(self.run())
+    else:
+      # the loop may be sleeping until a later job is due; make it reschedule
+      self.wake.set()
+    return await future
+
+  async def run(self) -> None:
+    loop = asyncio.get_running_loop()
+    while self.jobs:
+      now = loop.time()
+      due = [job_id for job_id, job in self.jobs.items() if job["next"] <= now]
+      results = await asyncio.gather(
+        *(asyncio.to_thread(fetch_job, self.api_key, job_id) for job_id in due), return_exceptions=True
+      )
+      now = loop.time()
+      for job_id, result in zip(due, results):
+        job = self.jobs[job_id]
+        if isinstance(result, Exception):
+          rate_limited = isinstance(result, requests.HTTPError) and result.response.status_code == 429
+          if not rate_limited and not isinstance(result, (requests.ConnectionError, requests.Timeout)):
+            del self.jobs[job_id]
+            job["future"].set_exception(result)
+            continue
+          # transient: back off harder than for a busy job
+          job["interval"] = min(self.max_interval, job["interval"] * 2)
+        elif result.get("status") not in ACTIVE_STATUSES:
+          del self.jobs[job_id]
+          job["future"].set_result(result)
+          continue
+        else:
+          job["interval"] = min(self.max_interval, job["interval"] * 1.5)
+        if now > job["deadline"]:
+          del self.jobs[job_id]
+          job["future"].set_exception(RuntimeError(f"Timed out waiting for job {job_id}."))
+          continue
+        job["next"] = now + job["interval"] * random.uniform(0.9, 1.1)
+      if self.jobs:
+        delay = max(0.0, min(job["next"] for job in self.jobs.values()) - loop.time())
+        try:
+          await asyncio.wait_for(self.wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+          pass
+        self.wake.clear()
+
+
+def job_gone(exc: Exception) -> bool:
+  """True when the API definitively rejected the job id (a 4xx other than rate limiting)."""
+  if not isinstance(exc, requests.HTTPError) or exc.response is None:
+    return False
+  return 400 <= exc.response.status_code < 500 and exc.response.status_code != 429
+
+
+async def run_batch(args, api_key: str) -> int:
+  pets = load_roster(Path(args.batch))
+  output_dir = Path(args.output_dir)
+  output_dir.mkdir(parents=True, exist_ok=True)
+  checkpoint = Checkpoint(Path(args.checkpoint) if args.checkpoint else output_dir / "checkpoint.json")
+  poller = JobPoller(
+    api_key,
+    base_interval=int(os.getenv("OPENAI_VIDEO_POLL_INTERVAL_MS", "5000")) / 1000,
+    max_interval=args.max_poll_interval,
+    timeout=int(os.getenv("OPENAI_VIDEO_TIMEOUT_MS", "240000")) / 1000,
   )
-  response.raise_for_status()
-  with output_path.open("wb") as file:
-    for chunk in response.iter_content(chunk_size=8192):
-      if chunk:
-        file.write(chunk)
+  slots = asyncio.Semaphore(args.concurrency)
+
+  async def process(pet: dict) -> None:
+    key = pet["key"]
+    output_path = output_dir / (pet["output"] or f"{key}.mp4")
+    entry = checkpoint.get(key)
+    if entry.get("status") == "completed" and output_path.exists():
+      print(f"[{key}] already finished, skipping")
+      return
+
+    async with slots:
+      job_id = entry.get("job_id") if entry.get("status") in ACTIVE_STATUSES | {"submitted", "downloading"} else None
+      if job_id:
+        print(f"[{key}] resuming job {job_id}")
+      else:
+        prompt = build_prompt(pet["name"], pet["bio"], pet["prompt"])
+        job_id = await asyncio.to_thread(create_job, api_key, prompt, args.model, args.seconds, args.size)
+        checkpoint.update(key, job_id=job_id, status="submitted", output=str(output_path))
+        print(f"[{key}] submitted job {job_id}")
+
+      try:
+        job = await poller.wait(job_id)
+      except Exception as exc:
+        if job_gone(exc):
+          # e.g. a 404 for a job that expired: forget it so the next run resubmits
+          checkpoint.update(key, status="failed", job_id=None, error=f"polling {job_id}: {exc}")
+        else:
+          # timed out or kept erroring: the job may still finish, so the next run resumes polling it
+          checkpoint.update(key, status="submitted", error=f"polling {job_id}: {exc}")
+        raise
+      status = job.get("status")
+      if status != "completed":
+        checkpoint.update(key, status=status, error=str(job.get("error")))
+        raise RuntimeError(f"Job failed with status: {status} / {job.get('error')}")
+
+      checkpoint.update(key, status="downloading")
+      await asyncio.to_thread(download_video, api_key, job_id, output_path)
+      checkpoint.update(key, status="completed")
+      print(f"[{key}] saved {output_path}")
+
+  results = await asyncio.gather(*(process(pet) for pet in pets), return_exceptions=True)
+  failures = 0
+  for pet, result in zip(pets, results):
+    if isinstance(result, Exception):
+      failures += 1
+      sys.stderr.write(f"[{pet['key']}] {result}\n")
+  print(f"Batch done: {len(pets) - failures} ok, {failures} failed.")
+  return failures
 
 
 def main():
   parser = argparse.ArgumentParser(description="Generate an adoption video with OpenAI.")
-  parser.add_argument("--pet-name", required=True, help="Dog's name.")
-  parser.add_argument("--pet-bio", required=True, help="Dog's short bio.")
+  parser.add_argument("--pet-name", help="Dog's name.")
+  parser.add_argument("--pet-bio", help="Dog's short bio.")
   parser.add_argument("--prompt", help="Optional prompt override.")
   parser.add_argument("--model", default=os.getenv("OPENAI_VIDEO_MODEL", "sora-2"))
   parser.add_argument("--seconds", default=os.getenv("OPENAI_VIDEO_SECONDS", "8"))
   parser.add_argument("--size", default=os.getenv("OPENAI_VIDEO_SIZE", "720x1280"))
   parser.add_argument("--output", default="openai-video.mp4")
+  parser.add_argument("--batch", help="CSV or JSONL roster to generate clips for.")
+  parser.add_argument("--output-dir", default="openai-videos", help="Where batch clips are written.")
+  parser.add_argument("--concurrency", type=int, default=4, help="Max jobs in flight during a batch.")
+  parser.add_argument("--checkpoint", help="Batch checkpoint file (default: <output-dir>/checkpoint.json).")
+  parser.add_argument("--max-poll-interval", type=float, default=30.0, help="Backoff ceiling in seconds.")
   args = parser.parse_args()
 
+  if args.batch:
+    api_key = resolve_key()
+    if asyncio.run(run_batch(args, api_key)):
+      sys.exit(1)
+    return
+  if not args.pet_name or not args.pet_bio:
+    parser.error("--pet-name and --pet-bio are required unless --batch is given")
+
   api_key = resolve_key()
   prompt = build_prompt(args.pet_name, args.pet_bio, args.prompt)
 
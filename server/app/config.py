@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -22,6 +22,10 @@ class Settings(BaseSettings):
     gemini_api_key: Optional[str] = Field(default=None, env="GEMINI_API_KEY")
     gemini_model: str = Field(default="gemini-1.5-flash")
 
+    story_reuse_enabled: bool = Field(default=True, env="STORY_REUSE_ENABLED")
+    story_similarity_threshold: float = Field(default=0.9, env="STORY_SIMILARITY_THRESHOLD")
+    story_index_path: Optional[str] = Field(default=None, env="STORY_INDEX_PATH")
+
     eleven_api_key: Optional[str] = Field(default=None, env="ELEVEN_API_KEY")
     eleven_voice_id: str = Field(default="Rachel")
 
@@ -33,18 +37,54 @@ class Settings(BaseSettings):
     storage_endpoint: Optional[str] = Field(default=None, env="MEDIA_ENDPOINT")
     public_media_base_url: Optional[str] = Field(default=None, env="MEDIA_BASE_URL")
 
+    # Domains
+    registered_domains_path: Optional[str] = Field(
+        default=None,
+        description="Local list or zone file of registered domains used to filter suggestions",
+        env="REGISTERED_DOMAINS_PATH",
+    )
+    registered_domains_index_path: Optional[str] = Field(
+        default=None,
+        description="Where the hashed domain index is cached (default: <REGISTERED_DOMAINS_PATH>.idx.npy)",
+        env="REGISTERED_DOMAINS_INDEX_PATH",
+    )
+
     # Workers / blockchain
     solana_worker_url: Optional[str] = Field(default=None, env="SOLANA_WORKER_URL")
     solana_rpc_url: Optional[str] = Field(default=None, env="SOLANA_RPC_URL")
+    solana_worker_batch_url: Optional[str] = Field(default=None, env="SOLANA_WORKER_BATCH_URL")
+    solana_batch_window_ms: float = Field(default=50.0, env="SOLANA_BATCH_WINDOW_MS")
+    solana_batch_max: int = Field(default=50, env="SOLANA_BATCH_MAX")
+    solana_result_cache_size: int = Field(default=10_000, env="SOLANA_RESULT_CACHE_SIZE")
 
     # Auth0
     auth0_domain: Optional[str] = Field(default=None, env="AUTH0_DOMAIN")
     auth0_client_id: Optional[str] = Field(default=None, env="AUTH0_CLIENT_ID")
     auth0_client_secret: Optional[str] = Field(default=None, env="AUTH0_CLIENT_SECRET")
+    auth0_events_db: Optional[str] = Field(default=None, env="AUTH0_EVENTS_DB")
+    auth0_batch_size: int = Field(default=200, env="AUTH0_BATCH_SIZE")
+    auth0_flush_interval_seconds: float = Field(default=1.0, env="AUTH0_FLUSH_INTERVAL_SECONDS")
 
     # Rendering / media
     ffmpeg_binary: str = Field(default="ffmpeg")
     tmp_dir: str = Field(default="/tmp")
+    image_workers: int = Field(default=2, env="IMAGE_WORKERS")
+    segment_cache_bytes: int = Field(default=1024**3, env="SEGMENT_CACHE_BYTES")
+    photo_cache_bytes: int = Field(default=256 * 1024**2, env="PHOTO_CACHE_BYTES")
+    render_cache_entries: int = Field(default=512, env="RENDER_CACHE_ENTRIES")
+    render_jobs_retained: int = Field(default=256, env="RENDER_JOBS_RETAINED")
+    render_preview_timeout_seconds: float = Field(default=5.0, env="RENDER_PREVIEW_TIMEOUT_SECONDS")
+    scratch_quota_bytes: int = Field(default=2 * 1024**3, env="SCRATCH_QUOTA_BYTES")
+    scratch_reference_ttl_seconds: int = Field(default=3600, env="SCRATCH_REFERENCE_TTL_SECONDS")
+    scratch_orphan_ttl_seconds: int = Field(default=900, env="SCRATCH_ORPHAN_TTL_SECONDS")
+    scratch_sweep_interval_seconds: int = Field(default=60, env="SCRATCH_SWEEP_INTERVAL_SECONDS")
+
+    # Startup
+    warm_services: str = Field(
+        default="",
+        description="Comma-separated services to build during lifespan warm-up, e.g. renderer,storage",
+        env="WARM_SERVICES",
+    )
 
     # Feature flags
     mock_mode: bool = Field(
@@ -52,6 +92,27 @@ class Settings(BaseSettings):
         description="When True, providers return synthetic responses for local dev",
         env="MOCK_MODE",
     )
+    mock_latency_distribution: Literal["none", "fixed", "normal", "longtail"] = Field(
+        default="none",
+        description="Synthetic provider latency in mock mode: none, fixed, normal or longtail",
+        env="MOCK_LATENCY_DISTRIBUTION",
+    )
+    mock_latency_ms: float = Field(default=0.0, env="MOCK_LATENCY_MS")
+    mock_latency_stddev_ms: float = Field(default=0.0, env="MOCK_LATENCY_STDDEV_MS")
+    mock_latency_tail_sigma: float = Field(default=1.0, env="MOCK_LATENCY_TAIL_SIGMA")
+    mock_error_rate: float = Field(default=0.0, env="MOCK_ERROR_RATE")
+    mock_rate_limit_rate: float = Field(default=0.0, env="MOCK_RATE_LIMIT_RATE")
+    mock_payload_bytes: int = Field(
+        default=0,
+        description="Minimum size of mock text payloads (OpenRouter scripts, Gemini storyboards)",
+        env="MOCK_PAYLOAD_BYTES",
+    )
+    mock_audio_seconds: Optional[float] = Field(
+        default=None,
+        description="Length of mock ElevenLabs clips; defaults to 2-8s based on the script length",
+        env="MOCK_AUDIO_SECONDS",
+    )
+    mock_seed: Optional[int] = Field(default=None, env="MOCK_SEED")
 
     class Config:
         env_file = ".env"
@@ -1,12 +1,42 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.routes import auth, domains, health, ingest, media, render, solana, story, voiceover
+from app.services.registry import registry
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm = [name.strip() for name in settings.warm_services.split(",") if name.strip()]
+    if settings.registered_domains_path and "domains" not in warm:
+        # building the registered-domain index can take minutes; never do it inside a request
+        warm.append("domains")
+    if warm:
+        await asyncio.to_thread(registry.warm_up, warm)
+    registry.mark_ready()
+    logger.info("Startup report: %s", registry.report())
+
+    background = []
+    if settings.scratch_sweep_interval_seconds > 0:
+        background.append(asyncio.create_task(registry.get("scratch").run_sweeper()))
+    background.append(asyncio.create_task(registry.get("auth0_events").run_flusher()))
+    yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    if registry.loaded("images"):
+        registry.get("images").shutdown()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.app_name, version="0.1.0")
+    app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -26,6 +56,7 @@ def create_app() -> FastAPI:
     app.include_router(solana.router, prefix=settings.api_prefix)
     app.include_router(media.router, prefix=settings.api_prefix)
 
+    registry.mark_app_created()
     return app
 
 
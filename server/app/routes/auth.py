@@ -1,11 +1,14 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from app.schemas import AuthWebhookPayload, AuthWebhookResponse
 from app.services.auth0 import handle_webhook
+from app.services.registry import registry
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/webhook", response_model=AuthWebhookResponse)
-async def auth_webhook(payload: AuthWebhookPayload) -> AuthWebhookResponse:
-    return handle_webhook(payload)
+async def auth_webhook(
+    payload: AuthWebhookPayload, events=Depends(registry.provider("auth0_events"))
+) -> AuthWebhookResponse:
+    return handle_webhook(payload, events)
@@ -1,12 +1,15 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from app.schemas import DomainSuggestionRequest, DomainSuggestionResponse
-from app.services.domains import generate_domains
+from app.services.registry import registry
 
 router = APIRouter(prefix="/domains", tags=["domains"])
 
 
 @router.post("/suggest", response_model=DomainSuggestionResponse)
-async def suggest_domains(payload: DomainSuggestionRequest) -> DomainSuggestionResponse:
-    suggestions = generate_domains(payload.pet_name, payload.location, payload.keywords, payload.tlds)
+async def suggest_domains(
+    payload: DomainSuggestionRequest, suggester=Depends(registry.provider("domains"))
+) -> DomainSuggestionResponse:
+    limit = max(1, min(payload.limit, 100))
+    suggestions = suggester.generate(payload.pet_name, payload.location, payload.keywords, payload.tlds, limit)
     return DomainSuggestionResponse(suggestions=suggestions)
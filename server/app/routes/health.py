@@ -3,6 +3,7 @@ from datetime import datetime
 from fastapi import APIRouter
 
 from app.schemas import HealthResponse
+from app.services.registry import registry
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -10,3 +11,18 @@ router = APIRouter(prefix="/health", tags=["health"])
 @router.get("", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
     return HealthResponse(status="ok", time=datetime.utcnow())
+
+
+@router.get("/startup")
+async def startup_report() -> dict:
+    return registry.report()
+
+
+@router.get("/scratch")
+async def scratch_metrics() -> dict:
+    return registry.get("scratch").metrics()
+
+
+@router.get("/webhooks")
+async def webhook_metrics() -> dict:
+    return registry.get("auth0_events").metrics()
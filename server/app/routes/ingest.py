@@ -1,15 +1,33 @@
-from fastapi import APIRouter, File, HTTPException, UploadFile
+import io
 
-from app.services.storage import storage_service
-from app.schemas import MediaIngestResponse
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+
+from app.schemas import MediaDerivative, MediaIngestResponse
+from app.services.registry import registry
 
 router = APIRouter(prefix="/ingest", tags=["media"])
 
 
 @router.post("", response_model=MediaIngestResponse)
-async def ingest_media(file: UploadFile = File(...)) -> MediaIngestResponse:
+async def ingest_media(
+    file: UploadFile = File(...),
+    storage_service=Depends(registry.provider("storage")),
+    images=Depends(registry.provider("images")),
+) -> MediaIngestResponse:
     if file.content_type and not file.content_type.startswith("image"):
         raise HTTPException(status_code=400, detail="Only image uploads are supported right now")
 
-    asset_id, url, checksum = storage_service.upload_file(file.file, suffix=file.filename or "")
-    return MediaIngestResponse(asset_id=asset_id, media_url=url, checksum=checksum)
+    data = await file.read()
+    asset_id, url, checksum = storage_service.upload_file(io.BytesIO(data), suffix=file.filename or "")
+
+    derivatives = {}
+    for name, variant in (await images.derivatives(data)).items():
+        _, variant_url, _ = storage_service.upload_file(io.BytesIO(variant["data"]), asset_id=f"{asset_id}.{name}.jpg")
+        derivatives[name] = MediaDerivative(
+            url=variant_url,
+            width=variant["width"],
+            height=variant["height"],
+            bytes=len(variant["data"]),
+            checksum=variant["checksum"],
+        )
+    return MediaIngestResponse(asset_id=asset_id, media_url=url, checksum=checksum, derivatives=derivatives)
@@ -1,24 +1,20 @@
-from pathlib import Path
-from urllib.parse import unquote
-
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse
 
-from app.config import settings
+from app.services.registry import registry
+from app.services.storage import MediaAccessError, resolve_local_media
 
 router = APIRouter(prefix="/media", tags=["media"])
 
 
 @router.get("/local")
 async def serve_local_file(path: str = Query(..., description="file:// URI within the tmp directory")):
-    decoded = unquote(path)
-    if decoded.startswith("file://"):
-        decoded = decoded[7:]
-
-    target = Path(decoded).resolve()
-    tmp_root = Path(settings.tmp_dir).resolve()
-
-    if not target.exists() or not str(target).startswith(str(tmp_root)):
+    try:
+        target = resolve_local_media(path)
+    except MediaAccessError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not target.exists():
         raise HTTPException(status_code=404, detail="File not found")
 
+    registry.get("scratch").touch(target)
     return FileResponse(target)
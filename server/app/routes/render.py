@@ -1,19 +1,67 @@
+import asyncio
 from datetime import datetime
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 
+from app.config import settings
 from app.schemas import RenderRequest, RenderResponse
-from app.services.renderer import get_renderer
-from app.services.storage import storage_service
+from app.services.registry import registry
+from app.services.storage import MediaAccessError
 
 router = APIRouter(prefix="/render", tags=["render"])
 
-renderer = get_renderer()
-
 
 @router.post("", response_model=RenderResponse)
-async def render_video(payload: RenderRequest) -> RenderResponse:
-    path = await renderer.render(payload.pet_name, payload.captions, payload.voiceover_url)
-    with path.open("rb") as stream:
-        _, url, _ = storage_service.upload_file(stream, suffix=path.suffix)
-    return RenderResponse(video_url=url, rendered_at=datetime.utcnow(), storyboard_preview=None)
+async def render_video(
+    payload: RenderRequest,
+    renderer=Depends(registry.provider("renderer")),
+    render_jobs=Depends(registry.provider("render_jobs")),
+) -> RenderResponse:
+    profile = renderer.profiles[payload.profile]
+    job_id = render_jobs.submit(_render(payload, renderer, profile), profile=profile.name)
+
+    if payload.profile == "final" and payload.background:
+        return RenderResponse(profile=profile.name, status="running", job_id=job_id)
+
+    timeout = settings.render_preview_timeout_seconds if payload.profile == "preview" else None
+    try:
+        url = await render_jobs.wait(job_id, timeout)
+    except MediaAccessError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail=f"Preview render exceeded {timeout:g}s; poll /render/jobs/{job_id} for the result",
+        )
+    return RenderResponse(
+        video_url=url, rendered_at=datetime.utcnow(), storyboard_preview=None, profile=profile.name, job_id=job_id
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=RenderResponse)
+async def render_job_status(job_id: str, render_jobs=Depends(registry.provider("render_jobs"))) -> RenderResponse:
+    status = render_jobs.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Render job not found")
+    return RenderResponse(job_id=job_id, **status)
+
+
+async def _render(payload: RenderRequest, renderer, profile) -> str:
+    render_cache = registry.get("render_cache")
+    storage_service = registry.get("storage")
+
+    # the scope belongs to the render rather than the request, so background jobs keep their files
+    with registry.get("scratch").scope() as scope:
+        audio_path = await renderer.download_audio(payload.voiceover_url, scope) if payload.voiceover_url else None
+        photo = await renderer.photos.load(payload.media_url, payload.media_checksum) if payload.media_url else None
+        key = render_cache.key(
+            renderer.template_version, profile.name, payload.pet_name, payload.captions, audio_path, photo
+        )
+
+        async def _encode() -> str:
+            path = await renderer.render(payload.pet_name, payload.captions, audio_path, scope, profile, photo)
+            with path.open("rb") as stream:
+                _, url, _ = storage_service.upload_file(stream, suffix=path.suffix)
+            return url
+
+        return await render_cache.get_or_render(key, _encode)
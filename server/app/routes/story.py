@@ -1,31 +1,39 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 
+from app.config import settings
 from app.schemas import StoryRequest, StoryResponse
-from app.services.gemini import get_gemini_client
-from app.services.openrouter import get_openrouter_client
+from app.services.registry import registry
+from app.services.storage import MediaAccessError
 
 router = APIRouter(prefix="/story", tags=["story"])
 
-openrouter_client = get_openrouter_client()
-gemini_client = get_gemini_client()
-
 
 @router.post("", response_model=StoryResponse)
-async def generate_story(payload: StoryRequest) -> StoryResponse:
+async def generate_story(
+    payload: StoryRequest,
+    openrouter_client=Depends(registry.provider("openrouter")),
+    gemini_client=Depends(registry.provider("gemini")),
+) -> StoryResponse:
+    if settings.story_reuse_enabled and payload.reuse_similar:
+        cached = registry.get("story_index").lookup(payload)
+        if cached:
+            # the cached storyboard was drawn from another pet's photo; only the script is reused
+            storyboard = await _storyboard(payload, gemini_client)
+            return cached.model_copy(
+                update={"storyboard": storyboard.get("storyboard"), "palette": storyboard.get("palette")}
+            )
+
     provider_results = await openrouter_client.generate_script(payload.pet_name, payload.bio, payload.traits)
     provider_results.sort(key=lambda r: (r["cost_usd"], r["latency_ms"]))
     top_script = provider_results[0]["content"]
 
-    storyboard = await gemini_client.storyboard(
-        f"Create a storyboard for {payload.pet_name} adoption video with CTA.",
-        image_url=str(payload.image_url) if payload.image_url else None,
-    )
+    storyboard = await _storyboard(payload, gemini_client)
 
     captions = _extract_caption_variants(top_script)
     hooks = _extract_hooks(top_script)
     hashtags = _extract_hashtags(top_script)
 
-    return StoryResponse(
+    response = StoryResponse(
         pet_name=payload.pet_name,
         script=top_script,
         caption_variants=captions,
@@ -35,6 +43,19 @@ async def generate_story(payload: StoryRequest) -> StoryResponse:
         storyboard=storyboard.get("storyboard"),
         palette=storyboard.get("palette"),
     )
+    if settings.story_reuse_enabled:
+        registry.get("story_index").add(payload, response)
+    return response
+
+
+async def _storyboard(payload: StoryRequest, gemini_client) -> dict:
+    try:
+        return await gemini_client.storyboard(
+            f"Create a storyboard for {payload.pet_name} adoption video with CTA.",
+            image_url=str(payload.image_url) if payload.image_url else None,
+        )
+    except MediaAccessError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 
 def _extract_caption_variants(script: str):
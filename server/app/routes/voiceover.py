@@ -1,17 +1,24 @@
-from fastapi import APIRouter
+from urllib.parse import unquote
+
+from fastapi import APIRouter, Depends
 
 from app.schemas import VoiceoverRequest, VoiceoverResponse
-from app.services.elevenlabs import get_elevenlabs_client
-from app.services.storage import storage_service
+from app.services.registry import registry
+from app.services.scratch import scratch_scope
 
 router = APIRouter(prefix="/voiceover", tags=["voiceover"])
 
-elevenlabs = get_elevenlabs_client()
-
 
 @router.post("", response_model=VoiceoverResponse)
-async def create_voiceover(payload: VoiceoverRequest) -> VoiceoverResponse:
-    path = await elevenlabs.synthesize(payload.script, payload.voice_id, payload.format)
+async def create_voiceover(
+    payload: VoiceoverRequest,
+    elevenlabs=Depends(registry.provider("elevenlabs")),
+    storage_service=Depends(registry.provider("storage")),
+    scope=Depends(scratch_scope),
+) -> VoiceoverResponse:
+    path = await elevenlabs.synthesize(payload.script, scope, payload.voice_id, payload.format)
     with path.open("rb") as stream:
         asset_id, url, _ = storage_service.upload_file(stream, suffix=path.suffix)
-    return VoiceoverResponse(url=url, local_path=str(path), duration_seconds=None)
+    # the synthesized file is scoped to this request; point at the retained copy when stored locally
+    local_path = unquote(url[7:]) if url.startswith("file://") else None
+    return VoiceoverResponse(url=url, local_path=local_path, duration_seconds=None)
@@ -1,13 +1,22 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel
 
 
+class MediaDerivative(BaseModel):
+    url: str
+    width: int
+    height: int
+    bytes: int
+    checksum: str
+
+
 class MediaIngestResponse(BaseModel):
     asset_id: str
     media_url: str
     checksum: str
+    derivatives: Dict[str, MediaDerivative] = {}
 
 
 class StoryRequest(BaseModel):
@@ -16,6 +25,7 @@ class StoryRequest(BaseModel):
     traits: List[str] = []
     prompt_style: Optional[str] = None
     image_url: Optional[str] = None
+    reuse_similar: bool = True
 
 
 class ModelChoice(BaseModel):
@@ -53,13 +63,20 @@ class RenderRequest(BaseModel):
     script: str
     captions: List[str]
     media_url: Optional[str] = None
+    media_checksum: Optional[str] = None
     voiceover_url: Optional[str] = None
+    profile: Literal["preview", "final"] = "final"
+    background: bool = False
 
 
 class RenderResponse(BaseModel):
     video_url: Optional[str] = None
     storyboard_preview: Optional[str] = None
-    rendered_at: datetime
+    rendered_at: Optional[datetime] = None
+    profile: str = "final"
+    status: str = "completed"
+    job_id: Optional[str] = None
+    error: Optional[str] = None
 
 
 class DomainSuggestionRequest(BaseModel):
@@ -67,6 +84,7 @@ class DomainSuggestionRequest(BaseModel):
     location: Optional[str] = None
     keywords: List[str] = []
     tlds: List[str] = [".pet", ".today", ".dev", ".org"]
+    limit: int = 10
 
 
 class DomainSuggestion(BaseModel):
@@ -89,6 +107,7 @@ class AuthWebhookPayload(BaseModel):
 class AuthWebhookResponse(BaseModel):
     ok: bool
     processed_at: datetime
+    duplicate: bool = False
 
 
 class MintRequest(BaseModel):
@@ -1,8 +1,146 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
 
+from app.config import settings
 from app.schemas import AuthWebhookPayload, AuthWebhookResponse
 
+logger = logging.getLogger(__name__)
 
-def handle_webhook(payload: AuthWebhookPayload) -> AuthWebhookResponse:
-    # In a production system this would call Auth0 Management API and/or persist to DB
-    return AuthWebhookResponse(ok=True, processed_at=datetime.utcnow())
+# recently persisted idempotency keys remembered in memory so retries skip the queue entirely
+RECENT_KEYS = 10_000
+
+
+class WebhookEventQueue:
+    """Write-behind buffer for Auth0 webhook events.
+
+    Events are appended in memory and flushed to SQLite in batches when the queue reaches
+    ``auth0_batch_size`` or every ``auth0_flush_interval_seconds``. Retried deliveries are
+    deduplicated on (user_id, event) both in memory and by the table's primary key. A failed
+    flush puts the batch back at the head of the queue so the next flush retries it.
+    """
+
+    def __init__(self) -> None:
+        self.db_path = Path(settings.auth0_events_db or Path(settings.tmp_dir) / "auth0-events.sqlite3")
+        self.batch_size = settings.auth0_batch_size
+        self.flush_interval = settings.auth0_flush_interval_seconds
+        self._queue: List[Tuple[AuthWebhookPayload, str]] = []
+        self._pending = set()
+        self._recent: "OrderedDict[tuple, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stats = {
+            "received": 0,
+            "duplicates": 0,
+            "flushed": 0,
+            "batches": 0,
+            "flush_failures": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+        }
+
+    def enqueue(self, payload: AuthWebhookPayload) -> bool:
+        """Queue an event; returns False when it is a duplicate delivery."""
+        key = (payload.user_id, payload.event)
+        with self._lock:
+            self._stats["received"] += 1
+            if key in self._pending or key in self._recent:
+                self._stats["duplicates"] += 1
+                return False
+            self._pending.add(key)
+            self._queue.append((payload, datetime.utcnow().isoformat()))
+            full = len(self._queue) >= self.batch_size
+        if full and self._wake is not None:
+            self._wake.set()
+        return True
+
+    def flush(self) -> int:
+        with self._lock:
+            batch, self._queue = self._queue, []
+        if not batch:
+            return 0
+
+        start = time.perf_counter()
+        rows = [(event.user_id, event.event, event.email, event.role, received_at) for event, received_at in batch]
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO auth0_events (user_id, event, email, role, received_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        rows,
+                    )
+        except sqlite3.Error:
+            # keys stay pending so retried deliveries are still deduplicated against the requeued batch
+            with self._lock:
+                self._queue = batch + self._queue
+                self._stats["flush_failures"] += 1
+            raise
+        elapsed = round((time.perf_counter() - start) * 1000, 2)
+
+        with self._lock:
+            for event, _ in batch:
+                key = (event.user_id, event.event)
+                self._pending.discard(key)
+                self._recent[key] = None
+            while len(self._recent) > RECENT_KEYS:
+                self._recent.popitem(last=False)
+            self._stats["flushed"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["last_flush_ms"] = elapsed
+            self._stats["max_flush_ms"] = max(self._stats["max_flush_ms"], elapsed)
+        return len(batch)
+
+    async def run_flusher(self) -> None:
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                try:
+                    await asyncio.to_thread(self.flush)
+                except sqlite3.Error:
+                    logger.exception("Auth0 event flush failed")
+        finally:
+            # drain whatever arrived before shutdown
+            try:
+                await asyncio.to_thread(self.flush)
+            except sqlite3.Error:
+                logger.exception("Auth0 event flush failed on shutdown; %d events dropped", len(self._queue))
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {"queue_depth": len(self._queue), **self._stats}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS auth0_events ("
+                "user_id TEXT NOT NULL, event TEXT NOT NULL, email TEXT, role TEXT, received_at TEXT, "
+                "PRIMARY KEY (user_id, event))"
+            )
+        return self._conn
+
+
+def get_webhook_queue() -> WebhookEventQueue:
+    return WebhookEventQueue()
+
+
+def handle_webhook(payload: AuthWebhookPayload, events: WebhookEventQueue) -> AuthWebhookResponse:
+    duplicate = not events.enqueue(payload)
+    return AuthWebhookResponse(ok=True, processed_at=datetime.utcnow(), duplicate=duplicate)
@@ -1,38 +1,218 @@
-import random
-from typing import List
+import hashlib
+import itertools
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
 
 SUFFIX_SCORES = {".pet": 1.0, ".today": 0.9, ".dev": 0.7, ".org": 0.85, ".love": 0.65}
 
+# affix -> score bonus; the empty affix lets the bare combination through
+PREFIXES: Dict[str, float] = {
+    "": 0.0,
+    "adopt": 0.08,
+    "meet": 0.07,
+    "get": 0.05,
+    "team": 0.04,
+    "hello": 0.04,
+    "love": 0.03,
+    "rescue": 0.05,
+    "my": 0.02,
+}
+SUFFIXES: Dict[str, float] = {
+    "": 0.0,
+    "needsyou": 0.08,
+    "home": 0.06,
+    "adoption": 0.06,
+    "rescue": 0.05,
+    "pal": 0.03,
+    "forever": 0.04,
+    "crew": 0.02,
+    "hq": 0.02,
+}
+LOCATION_BONUS = 0.06
+KEYWORD_BONUS = 0.04
+IDEAL_LABEL_LENGTH = 10
+MAX_LABEL_LENGTH = 63
+# candidates are checked for availability in ranked batches of this many times the requested limit
+BATCH_FACTOR = 4
+# zone file records hashed per numpy chunk while building the index
+BUILD_CHUNK = 1_000_000
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def domain_hash(domain: str) -> int:
+    return int.from_bytes(hashlib.blake2b(domain.encode("utf-8"), digest_size=8).digest(), "little")
+
 
-def generate_domains(pet_name: str, location: str | None, keywords: List[str], tlds: List[str]) -> List[dict]:
-    base_words = [pet_name.lower()]
-    if location:
-        base_words.append(location.lower().replace(" ", ""))
-    base_words.extend([k.lower().replace(" ", "") for k in keywords])
-
-    combos = set()
-    seeds = [
-        f"get{base_words[0]}",
-        f"team{base_words[0]}",
-        f"{base_words[0]}needsyou",
-    ]
-    if len(base_words) > 1:
-        seeds.append(f"{base_words[0]}{base_words[1]}")
-
-    combos.update(seeds)
-
-    suggestions = []
-    for combo in combos:
-        for tld in tlds:
-            score = min(1.0, 0.6 + len(combo) / 50 + SUFFIX_SCORES.get(tld, 0.5))
-            jitter = random.uniform(-0.05, 0.05)
-            suggestions.append(
-                {
-                    "domain": f"{combo}{tld}",
-                    "score": round(max(0.2, min(1.0, score + jitter)), 2),
-                    "reason": f"Short + brandable + {tld} promo",
-                }
+class RegisteredDomainIndex:
+    """Sorted, memory-mapped array of 64-bit hashes of already-registered domains.
+
+    Built once from a plain domain list or zone file (first column of each record) and cached
+    at ``index_path`` (default ``<source>.idx.npy``); rebuilt when the source is newer than the
+    index. If the index cannot be written the built array is kept in memory instead.
+    """
+
+    def __init__(self, source: Optional[str], index_path: Optional[str] = None) -> None:
+        self.hashes = np.empty(0, dtype=np.uint64)
+        if source:
+            source_path = Path(source)
+            self.hashes = self._load(
+                source_path, Path(index_path) if index_path else source_path.with_name(source_path.name + ".idx.npy")
             )
 
-    suggestions.sort(key=lambda x: x["score"], reverse=True)
-    return suggestions[:10]
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def taken(self, domains: List[str]) -> np.ndarray:
+        if not len(self.hashes) or not domains:
+            return np.zeros(len(domains), dtype=bool)
+        needles = np.fromiter((domain_hash(d) for d in domains), dtype=np.uint64, count=len(domains))
+        positions = np.minimum(np.searchsorted(self.hashes, needles), len(self.hashes) - 1)
+        return self.hashes[positions] == needles
+
+    def _load(self, source: Path, index_path: Path) -> np.ndarray:
+        if not source.exists():
+            logger.warning("Registered domain list %s not found; availability filter disabled", source)
+            return np.empty(0, dtype=np.uint64)
+        if index_path.exists() and index_path.stat().st_mtime >= source.stat().st_mtime:
+            return np.load(index_path, mmap_mode="r")
+        array = self.build(source)
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            staged = index_path.with_name(index_path.name + ".partial.npy")
+            np.save(staged, array)
+            staged.replace(index_path)
+        except OSError as exc:
+            # e.g. a read-only data directory: serve from memory rather than rebuilding per process
+            logger.warning("Could not cache domain index at %s (%s); keeping it in memory", index_path, exc)
+            return array
+        return np.load(index_path, mmap_mode="r")
+
+    @staticmethod
+    def build(source: Path) -> np.ndarray:
+        """Hash every domain in ``source`` into a sorted, de-duplicated uint64 array, a chunk at a time."""
+        merged = np.empty(0, dtype=np.uint64)
+        tail: List[np.ndarray] = []
+        tail_size = 0
+        with source.open("r", encoding="utf-8", errors="ignore") as stream:
+            domains = _zone_domains(stream)
+            while True:
+                chunk = np.unique(
+                    np.fromiter((domain_hash(d) for d in itertools.islice(domains, BUILD_CHUNK)), dtype=np.uint64)
+                )
+                if not chunk.size:
+                    break
+                tail.append(chunk)
+                tail_size += chunk.size
+                if tail_size >= merged.size:
+                    # geometric merging keeps the total sort work at O(n log n)
+                    merged = np.unique(np.concatenate([merged, *tail]))
+                    tail, tail_size = [], 0
+        array = np.unique(np.concatenate([merged, *tail])) if tail else merged
+        logger.info("Indexed %d registered domains from %s", len(array), source)
+        return array
+
+
+def _zone_domains(lines) -> Iterator[str]:
+    for line in lines:
+        token = line.split(None, 1)[0].lower().rstrip(".") if line.strip() else ""
+        if token and not token.startswith((";", "#", "$")) and "." in token:
+            yield token
+
+
+class DomainSuggester:
+    def __init__(self) -> None:
+        self.index = RegisteredDomainIndex(settings.registered_domains_path, settings.registered_domains_index_path)
+
+    def generate(
+        self,
+        pet_name: str,
+        location: str | None,
+        keywords: List[str],
+        tlds: List[str],
+        limit: int = 10,
+    ) -> List[dict]:
+        pet = _slug(pet_name)
+        tlds = [tld if tld.startswith(".") else f".{tld}" for tld in dict.fromkeys(t.lower() for t in tlds)]
+        if not pet or not tlds:
+            return []
+
+        labels, label_bonus = self._labels(pet, _slug(location or ""), [_slug(k) for k in keywords])
+        lengths = np.fromiter((len(label) for label in labels), dtype=np.float64, count=len(labels))
+        length_score = np.clip(1.0 - np.abs(lengths - IDEAL_LABEL_LENGTH) / 20.0, 0.0, 1.0)
+        tld_score = np.array([SUFFIX_SCORES.get(tld, 0.5) for tld in tlds])
+
+        # labels x tlds score matrix, flattened row-major so flat index // len(tlds) is the label
+        scores = np.clip(
+            0.15 + 0.35 * length_score[:, None] + 0.35 * tld_score[None, :] + label_bonus[:, None], 0.2, 1.0
+        ).round(3).ravel()
+        # labels are sorted, so the flat index is a deterministic alphabetical tie-break
+        order = np.lexsort((np.arange(scores.size), -scores))
+
+        results: List[dict] = []
+        batch = max(limit, 1) * BATCH_FACTOR
+        for start in range(0, order.size, batch):
+            chunk = order[start : start + batch]
+            domains = [labels[i // len(tlds)] + tlds[i % len(tlds)] for i in chunk]
+            for flat, domain, taken in zip(chunk, domains, self.index.taken(domains)):
+                if taken:
+                    continue
+                tld = tlds[flat % len(tlds)]
+                results.append({"domain": domain, "score": float(scores[flat]), "reason": self._reason(domain, tld)})
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def _labels(self, pet: str, location: str, keywords: List[str]):
+        cores: Dict[str, float] = {pet: 0.0}
+        if location:
+            cores[f"{pet}{location}"] = LOCATION_BONUS
+            cores[f"{location}{pet}"] = LOCATION_BONUS
+        for keyword in dict.fromkeys(k for k in keywords if k):
+            cores[f"{pet}{keyword}"] = max(cores.get(f"{pet}{keyword}", 0.0), KEYWORD_BONUS)
+            cores[f"{keyword}{pet}"] = max(cores.get(f"{keyword}{pet}", 0.0), KEYWORD_BONUS)
+            if location:
+                cores[f"{pet}{keyword}{location}"] = LOCATION_BONUS + KEYWORD_BONUS
+
+        candidates: Dict[str, float] = {}
+        for core, core_bonus in cores.items():
+            for prefix, prefix_bonus in PREFIXES.items():
+                for suffix, suffix_bonus in SUFFIXES.items():
+                    label = f"{prefix}{core}{suffix}"
+                    if len(label) > MAX_LABEL_LENGTH:
+                        continue
+                    bonus = core_bonus + prefix_bonus + suffix_bonus
+                    if bonus > candidates.get(label, -1.0):
+                        candidates[label] = bonus
+
+        labels = sorted(candidates)
+        return labels, np.array([candidates[label] for label in labels], dtype=np.float64)
+
+    @staticmethod
+    def _reason(domain: str, tld: str) -> str:
+        length = "Short" if len(domain) - len(tld) <= 12 else "Descriptive"
+        return f"{length} + brandable + {tld} promo"
+
+
+def get_domain_suggester() -> DomainSuggester:
+    return DomainSuggester()
+
+
+if __name__ == "__main__":
+    # offline build: python -m app.services.domains (uses REGISTERED_DOMAINS_PATH / _INDEX_PATH)
+    logging.basicConfig(level=logging.INFO)
+    if not settings.registered_domains_path:
+        sys.exit("REGISTERED_DOMAINS_PATH is not set")
+    index = RegisteredDomainIndex(settings.registered_domains_path, settings.registered_domains_index_path)
+    print(f"{len(index)} registered domains indexed")
@@ -1,37 +1,32 @@
-import math
-import struct
-import tempfile
+import asyncio
 from pathlib import Path
 from typing import Optional
 import wave
 
 import httpx
+import numpy as np
 
 from app.config import settings
+from app.services.mock import mock_faults
+from app.services.scratch import ScratchScope
 
 
 class ElevenLabsClient:
     def __init__(self) -> None:
         self.api_key = settings.eleven_api_key
 
-    async def synthesize(self, text: str, voice_id: Optional[str] = None, fmt: str = "mp3") -> Path:
+    async def synthesize(
+        self, text: str, scope: ScratchScope, voice_id: Optional[str] = None, fmt: str = "mp3"
+    ) -> Path:
         voice = voice_id or settings.eleven_voice_id
 
         if settings.mock_mode or not self.api_key:
             # Always return a short WAV clip so the browser can actually play audio in mock mode
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-            duration = max(2, min(8, len(text) // 15))
-            sample_rate = 16_000
-            amplitude = 16_000
-            frequency = 220
-            with wave.open(tmp, "wb") as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(sample_rate)
-                for i in range(duration * sample_rate):
-                    value = int(amplitude * math.sin(2 * math.pi * frequency * (i / sample_rate)))
-                    wav_file.writeframes(struct.pack("<h", value))
-            return Path(tmp.name)
+            await mock_faults.simulate("elevenlabs")
+            tmp = scope.path("voice", ".wav")
+            duration = mock_faults.audio_seconds or max(2, min(8, len(text) // 15))
+            await asyncio.to_thread(_write_tone, tmp, duration)
+            return tmp
 
         endpoint = f"https://api.elevenlabs.io/v1/text-to-speech/{voice}"
         headers = {
@@ -47,10 +42,19 @@ class ElevenLabsClient:
             res = await client.post(endpoint, headers=headers, json=payload)
             res.raise_for_status()
 
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=f".{fmt}")
-        tmp.write(res.content)
-        tmp.close()
-        return Path(tmp.name)
+        tmp = scope.path("voice", f".{fmt}")
+        tmp.write_bytes(res.content)
+        return tmp
+
+
+def _write_tone(path: Path, seconds: float, sample_rate: int = 16_000) -> None:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    samples = (16_000 * np.sin(2 * np.pi * 220 * t)).astype("<i2")
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
 
 
 def get_elevenlabs_client() -> ElevenLabsClient:
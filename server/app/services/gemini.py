@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import base64
+import mimetypes
+
 import httpx
 
 from app.config import settings
+from app.services.mock import mock_faults
+from app.services.storage import derivative_url, fetch_media
 
 
 class GeminiClient:
@@ -12,8 +17,9 @@ class GeminiClient:
 
     async def storyboard(self, prompt: str, image_url: str | None = None) -> dict:
         if settings.mock_mode or not self.api_key:
+            await mock_faults.simulate("gemini")
             return {
-                "storyboard": "1) Close-up eyes. 2) Playful zoom. 3) CTA card",
+                "storyboard": mock_faults.pad("1) Close-up eyes. 2) Playful zoom. 3) CTA card"),
                 "palette": ["#f8d9d6", "#6c63ff"],
             }
 
@@ -30,7 +36,8 @@ class GeminiClient:
             }
         ]
         if image_url:
-            contents[0]["parts"].append({"inline_data": {"mime_type": "image/jpeg", "data": image_url}})
+            mime_type, data = await self._inline_image(image_url)
+            contents[0]["parts"].append({"inline_data": {"mime_type": mime_type, "data": data}})
 
         payload = {"contents": contents}
 
@@ -42,6 +49,17 @@ class GeminiClient:
         text = data["candidates"][0]["content"]["parts"][0]["text"]
         return {"storyboard": text}
 
+    async def _inline_image(self, image_url: str) -> tuple[str, str]:
+        """Fetch and base64-encode an image URL; pass anything else through as already-encoded data.
+
+        The small ``gemini`` ingest derivative is used when it exists, falling back to the URL as given.
+        """
+        if not image_url.startswith(("file://", "http://", "https://")):
+            return "image/jpeg", image_url
+        used, raw = await fetch_media(derivative_url(image_url, "gemini"), image_url)
+        mime_type = mimetypes.guess_type(used)[0] or "image/jpeg"
+        return mime_type, base64.b64encode(raw).decode("ascii")
+
 
 def get_gemini_client() -> GeminiClient:
     return GeminiClient()
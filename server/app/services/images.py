@@ -0,0 +1,80 @@
+import asyncio
+import hashlib
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# name -> (max side in px, JPEG quality); ordered large to small so each variant is resized from the previous one
+DERIVATIVE_SPECS: Dict[str, Tuple[int, int]] = {
+    "master": (4096, 90),
+    "render": (1600, 85),
+    "gemini": (768, 80),
+    "thumb": (256, 75),
+}
+
+
+def build_derivatives(data: bytes) -> Dict[str, Tuple[bytes, int, int]]:
+    """Decode once, apply EXIF orientation and emit every derivative as JPEG bytes with its size."""
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source).convert("RGB")
+
+    derivatives = {}
+    for name, (max_side, quality) in DERIVATIVE_SPECS.items():
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=quality, optimize=True)
+        derivatives[name] = (buffer.getvalue(), image.width, image.height)
+    return derivatives
+
+
+class ImagePipeline:
+    """Runs derivative generation in a process pool so uploads don't hold the GIL or the event loop."""
+
+    def __init__(self) -> None:
+        self.workers = settings.image_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def derivatives(self, data: bytes) -> Dict[str, dict]:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        loop = asyncio.get_running_loop()
+        try:
+            built = await loop.run_in_executor(self._pool, build_derivatives, data)
+        except (UnidentifiedImageError, OSError) as exc:
+            # e.g. HEIC without a Pillow plugin: keep the original and skip derivatives
+            logger.warning("Could not build image derivatives: %s", exc)
+            return {}
+        except BrokenProcessPool:
+            # a worker died (OOM-killed on a huge image); the pool is unusable, so start a fresh one next time
+            logger.exception("Image worker pool broke while building derivatives")
+            self.shutdown()
+            return {}
+        except Exception:  # noqa: BLE001 - derivatives are best-effort, e.g. DecompressionBombError
+            logger.exception("Could not build image derivatives")
+            return {}
+        return {
+            name: {
+                "data": blob,
+                "width": width,
+                "height": height,
+                "checksum": hashlib.sha256(blob).hexdigest(),
+            }
+            for name, (blob, width, height) in built.items()
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def get_image_pipeline() -> ImagePipeline:
+    return ImagePipeline()
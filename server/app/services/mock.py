@@ -0,0 +1,59 @@
+import asyncio
+import math
+import random
+
+import httpx
+
+from app.config import settings
+
+
+class MockFaults:
+    """Synthetic latency, errors and payload sizes for providers running in mock mode."""
+
+    def __init__(self) -> None:
+        self.distribution = settings.mock_latency_distribution
+        self.latency_ms = max(0.0, settings.mock_latency_ms)
+        self.stddev_ms = max(0.0, settings.mock_latency_stddev_ms)
+        self.tail_sigma = max(0.0, settings.mock_latency_tail_sigma)
+        self.error_rate = settings.mock_error_rate
+        self.rate_limit_rate = settings.mock_rate_limit_rate
+        self.payload_bytes = max(0, settings.mock_payload_bytes)
+        self.audio_seconds = settings.mock_audio_seconds
+        self._random = random.Random(settings.mock_seed)
+
+    def latency_seconds(self) -> float:
+        if self.distribution == "fixed":
+            delay = self.latency_ms
+        elif self.distribution == "normal":
+            delay = self._random.gauss(self.latency_ms, self.stddev_ms)
+        elif self.distribution == "longtail":
+            # log-normal with the configured latency as its median
+            delay = self._random.lognormvariate(math.log(max(self.latency_ms, 1.0)), self.tail_sigma)
+        else:
+            delay = 0.0
+        return max(0.0, delay) / 1000
+
+    async def simulate(self, provider: str) -> None:
+        delay = self.latency_seconds()
+        if delay:
+            await asyncio.sleep(delay)
+
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            self._raise(provider, 429, "Too Many Requests")
+        if roll < self.rate_limit_rate + self.error_rate:
+            self._raise(provider, 503, "Service Unavailable")
+
+    def pad(self, content: str) -> str:
+        missing = self.payload_bytes - len(content.encode("utf-8"))
+        if missing <= 0:
+            return content
+        return content + " " + ("lorem " * (missing // 6 + 1))[: missing - 1]
+
+    def _raise(self, provider: str, status_code: int, reason: str) -> None:
+        request = httpx.Request("POST", f"https://mock.adoptify.local/{provider}")
+        response = httpx.Response(status_code, request=request, text=reason)
+        raise httpx.HTTPStatusError(f"[mock:{provider}] {status_code} {reason}", request=request, response=response)
+
+
+mock_faults = MockFaults()
@@ -5,6 +5,7 @@ from typing import List
 import httpx
 
 from app.config import settings
+from app.services.mock import mock_faults
 
 
 OPENROUTER_BASE = os.environ.get("OPENROUTER_BASE", "https://openrouter.ai/api/v1")
@@ -22,7 +23,8 @@ class OpenRouterClient:
         for model in self.models:
             start = time.perf_counter()
             if settings.mock_mode or not self.api_key:
-                content = self._mock_response(pet_name, model)
+                await mock_faults.simulate("openrouter")
+                content = mock_faults.pad(self._mock_response(pet_name, model))
                 latency = int((time.perf_counter() - start) * 1000)
                 results.append(
                     {
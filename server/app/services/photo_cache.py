@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import cv2
+import httpx
+import numpy as np
+
+from app.config import settings
+from app.services.storage import MediaAccessError, derivative_url, fetch_media
+
+logger = logging.getLogger(__name__)
+
+# Decoded photos are kept at most this large; every render size is derived from that master.
+MASTER_MAX_SIDE = 1600
+
+
+class PhotoCache:
+    """Bounded in-memory cache of decoded pet photos keyed by asset checksum.
+
+    Holds one downscaled master per photo plus the cover-cropped BGR arrays each render
+    profile asks for, so a pet rendered across many campaigns is fetched and decoded once.
+    """
+
+    def __init__(self) -> None:
+        self.max_bytes = settings.photo_cache_bytes
+        self._arrays: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._checksums: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def load(self, url: str, checksum: Optional[str] = None) -> Optional[str]:
+        """Make sure the photo behind ``url`` is decoded and cached; returns its checksum."""
+        checksum = checksum or self._checksums.get(url)
+        if checksum and self._get(("master", checksum)) is not None:
+            return checksum
+
+        try:
+            # prefer the render-sized ingest derivative; fall back to whatever the client uploaded
+            _, data = await fetch_media(derivative_url(url, "render"), url)
+            image = await asyncio.to_thread(self._decode, data)
+        except MediaAccessError:
+            raise
+        except (httpx.HTTPError, OSError, ValueError) as exc:
+            logger.warning("Could not load pet photo %s: %s", url, exc)
+            return None
+
+        checksum = checksum or hashlib.sha256(data).hexdigest()
+        self._put(("master", checksum), image)
+        with self._lock:
+            self._checksums[url] = checksum
+            self._checksums.move_to_end(url)
+            while len(self._checksums) > 1024:
+                self._checksums.popitem(last=False)
+        return checksum
+
+    def fitted(self, checksum: str, width: int, height: int) -> Optional[np.ndarray]:
+        """Cover-crop the master to ``width`` x ``height``."""
+        key = ("fitted", checksum, width, height)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        master = self._get(("master", checksum))
+        if master is None:
+            return None
+
+        src_h, src_w = master.shape[:2]
+        target_ratio = width / height
+        if src_w / src_h > target_ratio:
+            crop_w = int(round(src_h * target_ratio))
+            x0 = (src_w - crop_w) // 2
+            cropped = master[:, x0 : x0 + crop_w]
+        else:
+            crop_h = int(round(src_w / target_ratio))
+            y0 = (src_h - crop_h) // 2
+            cropped = master[y0 : y0 + crop_h]
+        fitted = cv2.resize(cropped, (width, height), interpolation=cv2.INTER_AREA)
+        self._put(key, fitted)
+        return fitted
+
+    @staticmethod
+    def _decode(data: bytes) -> np.ndarray:
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("unsupported image data")
+        longest = max(image.shape[:2])
+        if longest > MASTER_MAX_SIDE:
+            factor = MASTER_MAX_SIDE / longest
+            image = cv2.resize(image, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+        return image
+
+    def _get(self, key: Tuple) -> Optional[np.ndarray]:
+        with self._lock:
+            array = self._arrays.get(key)
+            if array is not None:
+                self._arrays.move_to_end(key)
+            return array
+
+    def _put(self, key: Tuple, array: np.ndarray) -> None:
+        with self._lock:
+            previous = self._arrays.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._arrays[key] = array
+            self._bytes += array.nbytes
+            while self._bytes > self.max_bytes and len(self._arrays) > 1:
+                _, evicted = self._arrays.popitem(last=False)
+                self._bytes -= evicted.nbytes
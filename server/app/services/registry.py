@@ -0,0 +1,92 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """Creates services (and the heavy modules behind them) on first use instead of at import time."""
+
+    def __init__(self) -> None:
+        self._factories: Dict[str, str] = {}
+        self._instances: Dict[str, Any] = {}
+        self._init_ms: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.started_at = time.perf_counter()
+        self.app_created_ms: Optional[float] = None
+        self.ready_ms: Optional[float] = None
+
+    def register(self, name: str, factory: str) -> None:
+        """Register a factory as a ``"module.path:callable"`` string so nothing is imported yet."""
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+            module_path, attr = self._factories[name].split(":")
+            start = time.perf_counter()
+            factory: Callable[[], Any] = getattr(importlib.import_module(module_path), attr)
+            instance = factory()
+            self._init_ms[name] = round((time.perf_counter() - start) * 1000, 2)
+            self._instances[name] = instance
+            logger.info("Service %s ready in %.1f ms", name, self._init_ms[name])
+            return instance
+
+    def loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def provider(self, name: str) -> Callable[[], Any]:
+        """Return a zero-argument callable suitable for ``fastapi.Depends``."""
+
+        def _provide() -> Any:
+            return self.get(name)
+
+        _provide.__name__ = f"get_{name}"
+        return _provide
+
+    def warm_up(self, names: Iterable[str]) -> None:
+        for name in names:
+            if name not in self._factories:
+                logger.warning("Unknown service %s in warm-up list", name)
+                continue
+            self.get(name)
+
+    def mark_app_created(self) -> None:
+        self.app_created_ms = round((time.perf_counter() - self.started_at) * 1000, 2)
+
+    def mark_ready(self) -> None:
+        self.ready_ms = round((time.perf_counter() - self.started_at) * 1000, 2)
+
+    def report(self) -> dict:
+        return {
+            "app_created_ms": self.app_created_ms,
+            "ready_ms": self.ready_ms,
+            "services": {
+                name: {"loaded": self.loaded(name), "init_ms": self._init_ms.get(name)}
+                for name in self._factories
+            },
+        }
+
+
+registry = ServiceRegistry()
+registry.register("scratch", "app.services.scratch:get_scratch_space")
+registry.register("storage", "app.services.storage:get_storage_service")
+registry.register("auth0_events", "app.services.auth0:get_webhook_queue")
+registry.register("domains", "app.services.domains:get_domain_suggester")
+registry.register("images", "app.services.images:get_image_pipeline")
+registry.register("renderer", "app.services.renderer:get_renderer")
+registry.register("render_cache", "app.services.render_cache:get_render_cache")
+registry.register("render_jobs", "app.services.render_jobs:get_render_jobs")
+registry.register("openrouter", "app.services.openrouter:get_openrouter_client")
+registry.register("gemini", "app.services.gemini:get_gemini_client")
+registry.register("elevenlabs", "app.services.elevenlabs:get_elevenlabs_client")
+registry.register("story_index", "app.services.story_index:get_story_index")
+registry.register("solana", "app.services.solana:get_solana_client")
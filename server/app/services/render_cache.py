@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import unquote
+
+from app.config import settings
+from app.services.registry import registry
+
+
+class RenderCache:
+    """Maps a hash of the render inputs to the stored video URL and coalesces identical in-flight renders."""
+
+    def __init__(self) -> None:
+        self.max_entries = settings.render_cache_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def key(
+        self,
+        template_version: str,
+        profile: str,
+        pet_name: str,
+        captions: List[str],
+        audio_path: Optional[Path],
+        photo_checksum: Optional[str] = None,
+    ) -> str:
+        audio_checksum = None
+        if audio_path:
+            with audio_path.open("rb") as stream:
+                audio_checksum = hashlib.file_digest(stream, "sha256").hexdigest()
+        material = {
+            "template": template_version,
+            "profile": profile,
+            "pet_name": pet_name,
+            "captions": captions,
+            "audio": audio_checksum,
+            "photo": photo_checksum,
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[str]]) -> str:
+        cached = self._lookup(key)
+        if cached:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            url = await render()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # mark the exception as retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        else:
+            self._store(key, url)
+            future.set_result(url)
+            return url
+        finally:
+            self._inflight.pop(key, None)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        url = self._entries.get(key)
+        if url is None:
+            return None
+        if url.startswith("file://"):
+            local = Path(unquote(url[7:]))
+            if not local.exists():
+                # the scratch quota evicted the stored render
+                del self._entries[key]
+                return None
+            registry.get("scratch").touch(local)
+        self._entries.move_to_end(key)
+        return url
+
+    def _store(self, key: str, url: str) -> None:
+        self._entries[key] = url
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def get_render_cache() -> RenderCache:
+    return RenderCache()
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RenderJobs:
+    """Keeps render tasks alive independently of the request that started them."""
+
+    def __init__(self) -> None:
+        self.max_jobs = settings.render_jobs_retained
+        self._tasks: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+        self._profiles: dict[str, str] = {}
+        self._finished: dict[str, datetime] = {}
+
+    def submit(self, render: Awaitable[str], profile: str) -> str:
+        job_id = f"render-{uuid.uuid4().hex}"
+        task = asyncio.ensure_future(render)
+        task.add_done_callback(self._log_failure)
+        task.add_done_callback(lambda _: self._finished.setdefault(job_id, datetime.utcnow()))
+        self._tasks[job_id] = task
+        self._profiles[job_id] = profile
+        self._prune()
+        return job_id
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> str:
+        # shielded so a timed-out caller leaves the render running (and feeding the caches)
+        return await asyncio.wait_for(asyncio.shield(self._tasks[job_id]), timeout)
+
+    def status(self, job_id: str) -> Optional[dict]:
+        task = self._tasks.get(job_id)
+        if task is None:
+            return None
+        status = {"profile": self._profiles[job_id], "status": "running", "video_url": None, "error": None}
+        if not task.done():
+            return status
+        if task.cancelled():
+            return {**status, "status": "failed", "error": "cancelled"}
+        if task.exception():
+            return {**status, "status": "failed", "error": str(task.exception())}
+        return {
+            **status,
+            "status": "completed",
+            "video_url": task.result(),
+            "rendered_at": self._finished.get(job_id),
+        }
+
+    def _prune(self) -> None:
+        for job_id in [job_id for job_id, task in self._tasks.items() if task.done()]:
+            if len(self._tasks) <= self.max_jobs:
+                break
+            del self._tasks[job_id]
+            del self._profiles[job_id]
+            self._finished.pop(job_id, None)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception():
+            logger.error("Render job failed: %s", task.exception())
+
+
+def get_render_jobs() -> RenderJobs:
+    return RenderJobs()
@@ -2,15 +2,49 @@ import asyncio
 import logging
 import shutil
 import subprocess
-import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import cv2
-import httpx
 import numpy as np
 
 from app.config import settings
+from app.services.photo_cache import PhotoCache
+from app.services.scratch import ScratchScope
+from app.services.segment_cache import SegmentCache
+from app.services.storage import fetch_media
+
+# Bump whenever card layout or encoding changes so cached renders are not reused.
+TEMPLATE_VERSION = "2"
+
+# Card layout is authored against this width and scaled for smaller profiles.
+BASE_WIDTH = 720
+# Photo area below the caption block, in BASE_WIDTH coordinates: (left, top, right inset, bottom inset)
+PHOTO_BOX = (60, 480, 60, 60)
+# End-of-card zoom for the pan/zoom motion.
+PHOTO_ZOOM = 1.12
+# Text sizes tried, largest first, until a long caption fits above the photo.
+CAPTION_SHRINK = (1.0, 0.85, 0.7, 0.6, 0.5)
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    name: str
+    width: int
+    height: int
+    fps: int
+    duration_per_card: int = 3
+
+    @property
+    def scale(self) -> float:
+        return self.width / BASE_WIDTH
+
+
+RENDER_PROFILES: Dict[str, RenderProfile] = {
+    "preview": RenderProfile(name="preview", width=360, height=640, fps=12),
+    "final": RenderProfile(name="final", width=720, height=1280, fps=30),
+}
 
 
 class Renderer:
@@ -19,12 +53,28 @@ class Renderer:
         self.tmp_dir.mkdir(parents=True, exist_ok=True)
         self.ffmpeg = settings.ffmpeg_binary
         self.ffmpeg_available = shutil.which(self.ffmpeg) is not None
+        self.template_version = TEMPLATE_VERSION
+        self.segments = SegmentCache()
+        self.profiles = RENDER_PROFILES
+        self.photos = PhotoCache()
 
-    async def render(self, pet_name: str, captions: List[str], voiceover_url: Optional[str]) -> Path:
-        frame_path = await asyncio.to_thread(self._make_slideshow, pet_name, captions)
-        if voiceover_url:
-            audio_path = await self._download_audio(voiceover_url)
-            merged = self.tmp_dir / f"render-{uuid.uuid4().hex}.mp4"
+    async def render(
+        self,
+        pet_name: str,
+        captions: List[str],
+        audio_path: Optional[Path],
+        scope: ScratchScope,
+        profile: RenderProfile = RENDER_PROFILES["final"],
+        photo: Optional[str] = None,
+    ) -> Path:
+        # Resolve the photo array once, up front, and hand that reference to the encoder so a
+        # concurrent cache eviction cannot silently drop the photo from a checksum-keyed segment.
+        source = self._photo_source(photo, profile) if photo else None
+        frame_path = await asyncio.to_thread(
+            self._make_slideshow, pet_name, captions, scope, profile, photo, source
+        )
+        if audio_path:
+            merged = scope.path("render", ".mp4")
             if not self.ffmpeg_available:
                 logging.warning("FFmpeg not found (%s); returning video without multiplexed audio", self.ffmpeg)
                 return frame_path
@@ -52,39 +102,163 @@ class Renderer:
                 return frame_path
         return frame_path
 
-    def _make_slideshow(self, pet_name: str, captions: List[str]) -> Path:
-        width, height = 720, 1280
-        fps = 30
-        duration_per_card = 3
-        output_path = self.tmp_dir / f"story-{uuid.uuid4().hex}.mp4"
+    def _make_slideshow(
+        self,
+        pet_name: str,
+        captions: List[str],
+        scope: ScratchScope,
+        profile: RenderProfile,
+        photo: Optional[str] = None,
+        source: Optional[np.ndarray] = None,
+    ) -> Path:
+        output_path = scope.path("story", ".mp4")
+        if not self.ffmpeg_available or not captions:
+            return self._encode_cards(pet_name, captions, output_path, profile, source)
+
+        # Each card is encoded once into the segment cache and stitched with stream copy,
+        # so editing one caption only re-encodes that card.
+        segments = [self._card_segment(pet_name, caption, profile, photo, source) for caption in captions]
+        concat_list = scope.path("concat", ".txt")
+        concat_list.write_text("".join(f"file '{self._concat_escape(segment)}'\n" for segment in segments))
+        cmd = [
+            self.ffmpeg,
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(concat_list),
+            "-c",
+            "copy",
+            str(output_path),
+        ]
+        try:
+            subprocess.run(cmd, check=True)
+            return output_path
+        except (FileNotFoundError, subprocess.CalledProcessError) as exc:
+            logging.error("FFmpeg concat failed (%s); re-encoding all cards", exc)
+            return self._encode_cards(pet_name, captions, output_path, profile, source)
+
+    def _card_segment(
+        self,
+        pet_name: str,
+        caption: str,
+        profile: RenderProfile,
+        photo: Optional[str],
+        source: Optional[np.ndarray],
+    ) -> Path:
+        key = self.segments.key(
+            template=self.template_version,
+            pet_name=pet_name,
+            caption=caption,
+            size=[profile.width, profile.height],
+            fps=profile.fps,
+            seconds=profile.duration_per_card,
+            photo=photo,
+        )
+        cached = self.segments.get(key)
+        if cached:
+            return cached
+        staged = self.segments.staging_path(key)
+        self._encode_cards(pet_name, [caption], staged, profile, source)
+        return self.segments.put(key, staged)
+
+    def _encode_cards(
+        self,
+        pet_name: str,
+        captions: List[str],
+        output_path: Path,
+        profile: RenderProfile,
+        source: Optional[np.ndarray] = None,
+    ) -> Path:
+        width, height = profile.width, profile.height
+        s = profile.scale
         writer = cv2.VideoWriter(
             str(output_path),
             cv2.VideoWriter_fourcc(*"mp4v"),
-            fps,
+            profile.fps,
             (width, height),
         )
 
+        n_frames = profile.duration_per_card * profile.fps
+        left, top, box_w, box_h = self._photo_box(profile)
+        motion = self._photo_motion(n_frames, box_w, box_h) if source is not None else None
+
+        margin = int(40 * s)
         for caption in captions:
             frame = np.full((height, width, 3), 245, dtype=np.uint8)
-            cv2.rectangle(frame, (40, 40), (width - 40, height - 40), (255, 255, 255), -1)
-            self._draw_text(frame, pet_name, (60, 120), scale=1.2, color=(134, 76, 191))
-            self._draw_multiline(frame, caption, (60, 200))
-            for _ in range(duration_per_card * fps):
+            cv2.rectangle(frame, (margin, margin), (width - margin, height - margin), (255, 255, 255), -1)
+            self._draw_text(frame, pet_name, (int(60 * s), int(120 * s)), scale=1.2 * s, color=(134, 76, 191))
+            self._draw_multiline(
+                frame,
+                caption,
+                (int(60 * s), int(200 * s)),
+                line_height=int(60 * s),
+                scale=0.9 * s,
+                bottom=top - int(10 * s) if motion is not None else None,
+            )
+            if motion is None:
+                for _ in range(n_frames):
+                    writer.write(frame)
+                continue
+            for matrix in motion:
+                frame[top : top + box_h, left : left + box_w] = cv2.warpAffine(
+                    source,
+                    matrix,
+                    (box_w, box_h),
+                    flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                    borderMode=cv2.BORDER_REPLICATE,
+                )
                 writer.write(frame)
 
         writer.release()
         return output_path
 
-    async def _download_audio(self, url: str) -> Path:
-        local = self.tmp_dir / f"voice-{uuid.uuid4().hex}.mp3"
-        if url.startswith("file://"):
-            local.write_bytes(Path(url[7:]).read_bytes())
-            return local
-        async with httpx.AsyncClient(timeout=60) as client:
-            res = await client.get(url)
-            res.raise_for_status()
-            local.write_bytes(res.content)
-            return local
+    @staticmethod
+    def _photo_box(profile: RenderProfile):
+        left, top, right, bottom = (int(v * profile.scale) for v in PHOTO_BOX)
+        return left, top, profile.width - left - right, profile.height - top - bottom
+
+    def _photo_source(self, photo: str, profile: RenderProfile) -> np.ndarray:
+        _, _, box_w, box_h = self._photo_box(profile)
+        source = self.photos.fitted(photo, int(np.ceil(box_w * PHOTO_ZOOM)), int(np.ceil(box_h * PHOTO_ZOOM)))
+        if source is None:
+            # never encode a photo-less card under a key that names the photo
+            raise LookupError(f"Pet photo {photo} was evicted before rendering; retry the request")
+        return source
+
+    @staticmethod
+    def _photo_motion(n_frames: int, box_w: int, box_h: int) -> np.ndarray:
+        """Inverse affine maps (box -> photo) for a slow zoom-in with a gentle horizontal pan.
+
+        The photo is pre-sized to ``PHOTO_ZOOM`` times the box, so every window stays in bounds.
+        """
+        t = np.linspace(0.0, 1.0, n_frames)
+        zoom = 1.0 + (PHOTO_ZOOM - 1.0) * t
+        window = PHOTO_ZOOM / zoom  # source pixels per box pixel
+        src_w, src_h = box_w * PHOTO_ZOOM, box_h * PHOTO_ZOOM
+        center_x = src_w / 2 + (src_w - box_w * window) / 2 * (t - 0.5)
+        center_y = np.full(n_frames, src_h / 2)
+
+        matrices = np.zeros((n_frames, 2, 3), dtype=np.float64)
+        matrices[:, 0, 0] = window
+        matrices[:, 1, 1] = window
+        matrices[:, 0, 2] = center_x - box_w * window / 2
+        matrices[:, 1, 2] = center_y - box_h * window / 2
+        return matrices
+
+    @staticmethod
+    def _concat_escape(path: Path) -> str:
+        return str(path.resolve()).replace("'", "'\\''")
+
+    async def download_audio(self, url: str, scope: ScratchScope) -> Path:
+        local = scope.path("voice", ".mp3")
+        _, data = await fetch_media(url)
+        local.write_bytes(data)
+        return local
 
     def _draw_text(self, frame, text: str, position, scale=1.0, color=(0, 0, 0)):
         cv2.putText(
@@ -94,27 +268,42 @@ class Renderer:
             cv2.FONT_HERSHEY_SIMPLEX,
             scale,
             color,
-            2,
+            max(1, round(2 * scale)),
             cv2.LINE_AA,
         )
 
-    def _draw_multiline(self, frame, text: str, origin, line_height: int = 60):
-        words = text.split(" ")
-        width_limit = 32
+    def _draw_multiline(
+        self, frame, text: str, origin, line_height: int = 60, scale: float = 0.9, bottom: Optional[int] = None
+    ):
+        """Draw wrapped text; with ``bottom`` set, shrink it until the last baseline is above that line."""
+        for shrink in CAPTION_SHRINK:
+            lines = self._wrap(text, int(32 / shrink))
+            step = int(line_height * shrink)
+            if bottom is None or origin[1] + (len(lines) - 1) * step <= bottom:
+                break
+        else:
+            # still too long at the smallest size: drop the lines that would sit under the photo
+            fit = max(1, (bottom - origin[1]) // step + 1)
+            lines = lines[:fit]
+            lines[-1] = lines[-1] + "..."
+
+        y = origin[1]
+        for line in lines:
+            self._draw_text(frame, line, (origin[0], y), scale=scale * shrink)
+            y += step
+
+    @staticmethod
+    def _wrap(text: str, width_limit: int) -> List[str]:
         lines = []
         buf = []
-        for word in words:
+        for word in text.split(" "):
             buf.append(word)
             if len(" ".join(buf)) > width_limit:
                 lines.append(" ".join(buf))
                 buf = []
         if buf:
             lines.append(" ".join(buf))
-
-        y = origin[1]
-        for line in lines:
-            self._draw_text(frame, line, (origin[0], y), scale=0.9)
-            y += line_height
+        return lines
 
 
 def get_renderer() -> Renderer:
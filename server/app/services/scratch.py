@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from app.config import settings
+from app.services.registry import registry
+
+logger = logging.getLogger(__name__)
+
+# tmp_dir is often the shared /tmp, so everything this service writes lives in its own subdirectory
+SCRATCH_DIRNAME = "adoptify"
+# only names generated by ScratchScope.path / StorageService.upload_file are ever swept or adopted
+RETAINED_NAME = re.compile(r"asset-[0-9a-f]{32}")
+INTERMEDIATE_NAME = re.compile(r"(story|render|voice|concat|scratch)-[0-9a-f]{32}(\.[A-Za-z0-9]+)?")
+
+
+def scratch_root() -> Path:
+    return Path(settings.tmp_dir).resolve() / SCRATCH_DIRNAME
+
+
+class ScratchScope:
+    """Temp files owned by a single request or render; all removed when the scope closes."""
+
+    def __init__(self, space: "ScratchSpace") -> None:
+        self.space = space
+        self._paths: List[Path] = []
+
+    def path(self, prefix: str, suffix: str = "") -> Path:
+        target = self.space.root / f"{prefix}-{uuid.uuid4().hex}{suffix}"
+        self._paths.append(target)
+        return target
+
+    def close(self) -> None:
+        removed = 0
+        for path in self._paths:
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        self._paths.clear()
+        self.space._record_scope_cleanup(removed)
+
+
+class ScratchSpace:
+    """Scratch space under ``<tmp_dir>/adoptify`` with a byte quota and LRU eviction for retained files.
+
+    Retained files back ``/api/media/local`` URLs; anything read within the reference TTL is
+    treated as still referenced and is never evicted.
+    """
+
+    def __init__(self) -> None:
+        self.root = scratch_root()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.quota_bytes = settings.scratch_quota_bytes
+        self.reference_ttl = settings.scratch_reference_ttl_seconds
+        self.orphan_ttl = settings.scratch_orphan_ttl_seconds
+        self.sweep_interval = settings.scratch_sweep_interval_seconds
+        # path -> (size_bytes, last_access); ordered from least to most recently used
+        self._retained: "OrderedDict[Path, Tuple[int, float]]" = OrderedDict()
+        self._retained_bytes = 0
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {
+            "scoped_files_removed": 0,
+            "orphans_removed": 0,
+            "evictions": 0,
+            "evicted_bytes": 0,
+            "sweeps": 0,
+            "last_sweep_ms": 0.0,
+        }
+
+    @contextmanager
+    def scope(self) -> Iterator[ScratchScope]:
+        scope = ScratchScope(self)
+        try:
+            yield scope
+        finally:
+            scope.close()
+
+    def retain(self, path: Path, last_access: float | None = None) -> None:
+        path = path.resolve()
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return
+        with self._lock:
+            previous = self._retained.pop(path, None)
+            if previous:
+                self._retained_bytes -= previous[0]
+            self._retained[path] = (size, last_access or time.time())
+            if last_access:
+                # adopted files keep their on-disk age rather than jumping the LRU queue
+                self._retained.move_to_end(path, last=False)
+            self._retained_bytes += size
+            self._enforce_quota()
+
+    def touch(self, path: Path) -> None:
+        path = path.resolve()
+        with self._lock:
+            entry = self._retained.get(path)
+            if entry is None:
+                return
+            self._retained[path] = (entry[0], time.time())
+            self._retained.move_to_end(path)
+
+    def sweep(self) -> None:
+        start = time.perf_counter()
+        now = time.time()
+        orphans = 0
+        for entry in self.root.iterdir():
+            if not entry.is_file():
+                continue
+            name = entry.name
+            try:
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if INTERMEDIATE_NAME.fullmatch(name) and now - mtime > self.orphan_ttl:
+                # left behind by a crashed worker or a request that never closed its scope
+                entry.unlink(missing_ok=True)
+                orphans += 1
+            elif RETAINED_NAME.match(name) and entry.resolve() not in self._retained:
+                self.retain(entry, last_access=mtime)
+
+        with self._lock:
+            for path in [p for p in self._retained if not p.exists()]:
+                self._retained_bytes -= self._retained.pop(path)[0]
+            self._enforce_quota()
+            self._counters["orphans_removed"] += orphans
+            self._counters["sweeps"] += 1
+            self._counters["last_sweep_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    async def run_sweeper(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception:  # noqa: BLE001 - the sweeper must outlive a bad pass
+                logger.exception("Scratch sweep failed")
+            await asyncio.sleep(self.sweep_interval)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "root": str(self.root),
+                "quota_bytes": self.quota_bytes,
+                "retained_bytes": self._retained_bytes,
+                "retained_files": len(self._retained),
+                **self._counters,
+            }
+
+    def _enforce_quota(self) -> None:
+        # caller holds self._lock
+        if self._retained_bytes <= self.quota_bytes:
+            return
+        now = time.time()
+        for path, (size, last_access) in list(self._retained.items()):
+            if self._retained_bytes <= self.quota_bytes:
+                return
+            if now - last_access < self.reference_ttl:
+                continue
+            path.unlink(missing_ok=True)
+            del self._retained[path]
+            self._retained_bytes -= size
+            self._counters["evictions"] += 1
+            self._counters["evicted_bytes"] += size
+        if self._retained_bytes > self.quota_bytes:
+            logger.warning(
+                "Scratch space over quota (%d > %d bytes) with only referenced files left",
+                self._retained_bytes,
+                self.quota_bytes,
+            )
+
+    def _record_scope_cleanup(self, removed: int) -> None:
+        with self._lock:
+            self._counters["scoped_files_removed"] += removed
+
+
+def get_scratch_space() -> ScratchSpace:
+    return ScratchSpace()
+
+
+def scratch_scope() -> Iterator[ScratchScope]:
+    """FastAPI dependency yielding a per-request scope."""
+    with registry.get("scratch").scope() as scope:
+        yield scope
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+
+
+class SegmentCache:
+    """Content-addressed store of encoded caption-card segments, trimmed oldest-first to a byte budget."""
+
+    def __init__(self) -> None:
+        self.root = Path(settings.tmp_dir) / "segments"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = settings.segment_cache_bytes
+        self._lock = threading.Lock()
+
+    def key(self, **inputs) -> str:
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.root / f"seg-{key}.mp4"
+        try:
+            # mtime doubles as the last-used stamp for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def staging_path(self, key: str) -> Path:
+        return self.root / f"seg-{key}.{threading.get_ident()}.partial.mp4"
+
+    def put(self, key: str, staged: Path) -> Path:
+        path = self.root / f"seg-{key}.mp4"
+        # atomic so a concurrent render never concatenates a half-written segment
+        os.replace(staged, path)
+        self._evict()
+        return path
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.root.glob("seg-*.mp4"):
+                if path.name.endswith(".partial.mp4"):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
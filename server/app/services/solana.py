@@ -1,22 +1,124 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple, Union
+
 import httpx
 
 from app.config import settings
+from app.services.mock import mock_faults
+
+MintKey = Tuple[str, str, Optional[str]]
 
 
 class SolanaClient:
-    def __init__(self) -> None:
+    """Coalesces badge mints into batched worker calls.
+
+    Requests arriving within ``solana_batch_window_ms`` are sent together. Calls for the same
+    (adopter_wallet, pet_id, campaign_id) share one mint, and completed mints are cached so
+    retries and double-clicks return the original signature without a worker round trip.
+    A window goes to ``solana_worker_batch_url`` as one call when that is configured, otherwise
+    as concurrent single-mint calls to ``solana_worker_url``. ``server/solana_worker_standin.py``
+    implements both endpoints locally.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
         self.worker_url = settings.solana_worker_url
+        self.batch_url = settings.solana_worker_batch_url
+        self.window = settings.solana_batch_window_ms / 1000
+        self.max_batch = settings.solana_batch_max
+        self.max_completed = settings.solana_result_cache_size
+        # e.g. httpx.ASGITransport(app=solana_worker_standin.app) to mint against the stand-in in-process
+        self.transport = transport
+        self._completed: "OrderedDict[MintKey, dict]" = OrderedDict()
+        self._inflight: Dict[MintKey, asyncio.Future] = {}
+        self._pending: List[MintKey] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._senders: Set[asyncio.Task] = set()
 
     async def mint_badge(self, adopter: str, pet_id: str, campaign_id: str | None = None) -> dict:
+        key = (adopter, pet_id, campaign_id)
+        if key in self._completed:
+            self._completed.move_to_end(key)
+            return self._completed[key]
+
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[key] = future
+            self._pending.append(key)
+            if len(self._pending) >= self.max_batch:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._dispatch)
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._senders.add(task)
+        task.add_done_callback(self._senders.discard)
+
+    async def _send(self, batch: List[MintKey]) -> None:
+        try:
+            results = await self._mint_batch(batch)
+            for key, result in zip(batch, results):
+                if not isinstance(result, (dict, Exception)):
+                    result = ValueError(f"Solana worker returned a malformed mint result: {result!r}")
+                if isinstance(result, Exception):
+                    self._fail(key, result)
+                    continue
+                if result.get("ok", True) and (result.get("signature") or result.get("sig")):
+                    self._completed[key] = result
+                    while len(self._completed) > self.max_completed:
+                        self._completed.popitem(last=False)
+                self._inflight.pop(key).set_result(result)
+            missing = [key for key in batch if key in self._inflight]
+            if missing:
+                raise ValueError(f"Solana worker returned no result for {len(missing)} mints")
+        except Exception as exc:  # noqa: BLE001 - every unresolved waiter gets the failure, nothing is cached
+            for key in batch:
+                if key in self._inflight:
+                    self._fail(key, exc)
+
+    def _fail(self, key: MintKey, exc: Exception) -> None:
+        future = self._inflight.pop(key)
+        future.set_exception(exc)
+        # mark retrieved so a waiter that already gave up doesn't log "exception never retrieved"
+        future.exception()
+
+    async def _mint_batch(self, batch: List[MintKey]) -> List[Union[dict, Exception]]:
         if settings.mock_mode or not self.worker_url:
-            return {"ok": True, "signature": f"MOCK-{pet_id}"}
+            await mock_faults.simulate("solana")
+            return [{"ok": True, "signature": f"MOCK-{pet_id}"} for _, pet_id, _ in batch]
 
-        payload = {"adopter": adopter, "petId": pet_id, "campaignId": campaign_id}
-        async with httpx.AsyncClient(timeout=30) as client:
-            res = await client.post(self.worker_url, json=payload)
+        payloads = [
+            {"adopter": adopter, "petId": pet_id, "campaignId": campaign_id}
+            for adopter, pet_id, campaign_id in batch
+        ]
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            if not self.batch_url or len(payloads) == 1:
+                # per-mint failures only fail their own waiters
+                return await asyncio.gather(
+                    *(self._mint_one(client, payload) for payload in payloads), return_exceptions=True
+                )
+            res = await client.post(self.batch_url, json={"mints": payloads})
             res.raise_for_status()
-            return res.json()
+            results = res.json()["results"]
+        if len(results) != len(batch):
+            raise ValueError(f"Solana worker returned {len(results)} results for {len(batch)} mints")
+        return results
+
+    async def _mint_one(self, client: httpx.AsyncClient, payload: dict) -> dict:
+        res = await client.post(self.worker_url, json=payload)
+        res.raise_for_status()
+        return res.json()
 
 
-def get_solana_client() -> SolanaClient:
-    return SolanaClient()
+def get_solana_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> SolanaClient:
+    return SolanaClient(transport=transport)
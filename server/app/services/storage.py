@@ -1,24 +1,78 @@
+import asyncio
 import hashlib
 import os
 import uuid
 from pathlib import Path
-from typing import BinaryIO, Optional
+from typing import BinaryIO, Optional, Tuple
+from urllib.parse import unquote
 
-import boto3
-from botocore.client import Config
+import httpx
 
 from app.config import settings
+from app.services.registry import registry
+from app.services.scratch import scratch_root
+
+
+class MediaAccessError(ValueError):
+    """A client-supplied media URL points at a local file outside the media directory."""
+
+
+def resolve_local_media(uri: str) -> Path:
+    """Map a ``file://`` URI to a path, refusing anything outside the scratch space."""
+    decoded = unquote(uri)
+    if decoded.startswith("file://"):
+        decoded = decoded[7:]
+    target = Path(decoded).resolve()
+    if not target.is_relative_to(scratch_root()):
+        raise MediaAccessError("Local media URLs must point inside the media directory")
+    return target
+
+
+def derivative_url(media_url: str, name: str) -> str:
+    """URL of an ingest derivative (see ``app.services.images``), stored as ``<asset>.<name>.jpg``."""
+    suffix = f".{name}.jpg"
+    return media_url if media_url.endswith(suffix) else media_url + suffix
+
+
+async def fetch_media(*urls: str) -> Tuple[str, bytes]:
+    """Fetch the first of ``urls`` that exists; returns the URL used and its bytes."""
+    last_error: Exception = FileNotFoundError("no media URL given")
+    for url in urls:
+        try:
+            if url.startswith("file://"):
+                path = resolve_local_media(url)
+                data = await asyncio.to_thread(path.read_bytes)
+                # a read is a reference: keeps uploads that are still being rendered from being evicted
+                registry.get("scratch").touch(path)
+                return url, data
+            async with httpx.AsyncClient(timeout=60) as client:
+                res = await client.get(url)
+                res.raise_for_status()
+                return url, res.content
+        except (httpx.HTTPError, FileNotFoundError) as exc:
+            last_error = exc
+    raise last_error
 
 
 class StorageService:
     def __init__(self) -> None:
         self.bucket = settings.storage_bucket
         self.base_url = settings.public_media_base_url
-        self.tmp_dir = Path(settings.tmp_dir)
-        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.local_dir = scratch_root()
+        self.local_dir.mkdir(parents=True, exist_ok=True)
         self._client = None
+        self._client_ready = False
+
+    def _get_client(self):
+        # boto3 is slow to import and build, so the client is created on the first upload
+        if self._client_ready:
+            return self._client
+        self._client_ready = True
 
         if self.bucket and settings.storage_access_key and settings.storage_secret_key:
+            import boto3
+            from botocore.client import Config
+
             endpoint = settings.storage_endpoint or "https://s3.amazonaws.com"
             self._client = boto3.client(
                 "s3",
@@ -28,26 +82,32 @@ class StorageService:
                 aws_secret_access_key=settings.storage_secret_key,
                 config=Config(signature_version="s3v4"),
             )
+        return self._client
 
     def _hash_bytes(self, data: bytes) -> str:
         return hashlib.sha256(data).hexdigest()
 
-    def upload_file(self, file_obj: BinaryIO, suffix: str = "") -> tuple[str, str, str]:
+    def upload_file(
+        self, file_obj: BinaryIO, suffix: str = "", asset_id: Optional[str] = None
+    ) -> tuple[str, str, str]:
         data = file_obj.read()
         checksum = self._hash_bytes(data)
-        asset_id = f"asset-{uuid.uuid4().hex}{suffix}"
+        asset_id = asset_id or f"asset-{uuid.uuid4().hex}{suffix}"
         filename = f"{asset_id}"
 
-        if self._client and self.bucket:
+        client = self._get_client()
+        if client and self.bucket:
             key = f"uploads/{filename}"
-            self._client.put_object(Bucket=self.bucket, Key=key, Body=data)
+            client.put_object(Bucket=self.bucket, Key=key, Body=data)
             url = self.base_url.rstrip("/") + f"/{key}" if self.base_url else key
             return asset_id, url, checksum
 
         # fallback: local tmp store
-        local_path = self.tmp_dir / filename
+        local_path = self.local_dir / filename
         local_path.write_bytes(data)
+        registry.get("scratch").retain(local_path)
         return asset_id, local_path.as_uri(), checksum
 
 
-storage_service = StorageService()
+def get_storage_service() -> StorageService:
+    return StorageService()
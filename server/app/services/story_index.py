@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.schemas import ModelChoice, StoryRequest, StoryResponse
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MERSENNE_PRIME = (1 << 31) - 1
+PET_PLACEHOLDER = "<pet>"
+# below this many tokens a bio is mostly boilerplate ("", "cute!!") and every such bio hashes alike
+MIN_TOKENS = 8
+NUMBER = re.compile(r"\d+")
+TEXT_FIELDS = ("script", "caption_variants", "hook_variants", "hashtags")
+
+
+def _permutations() -> np.ndarray:
+    # fixed seed: signatures are persisted, so the hash family must not change between runs
+    rng = np.random.default_rng(20240521)
+    a = rng.integers(1, MERSENNE_PRIME, size=NUM_PERM, dtype=np.int64)
+    b = rng.integers(0, MERSENNE_PRIME, size=NUM_PERM, dtype=np.int64)
+    return np.stack([a, b])
+
+
+class StoryIndex:
+    """MinHash/LSH index over past story bios so template-like bios reuse an existing script.
+
+    Only the script fields are reused: the storyboard and palette describe the previous pet's
+    photo, so reused responses come back without them for the caller to regenerate.
+
+    Bios are normalised (pet name replaced by a placeholder, traits appended) and shingled into
+    word 3-grams. Numbers (ages, weights) must match exactly, since a single differing digit barely
+    moves the signature. Entries are appended to a JSONL file and re-bucketed on startup.
+    """
+
+    def __init__(self) -> None:
+        self.path = Path(settings.story_index_path or Path(settings.tmp_dir) / "script-index.jsonl")
+        self.threshold = settings.story_similarity_threshold
+        self._perms = _permutations()
+        self._entries: List[dict] = []
+        self._signatures: List[np.ndarray] = []
+        self._buckets: Dict[tuple, List[int]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._load()
+
+    def lookup(self, request: StoryRequest) -> Optional[StoryResponse]:
+        tokens = self._tokens(request)
+        if len(tokens) < MIN_TOKENS:
+            return None
+        signature = self._signature(tokens)
+        numbers = self._numbers(tokens)
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(
+                entry_id
+                for entry_id in self._buckets.get((request.prompt_style, band, key), ())
+                if self._entries[entry_id].get("numbers") == numbers
+            )
+        if not candidates:
+            return None
+
+        ids = sorted(candidates)
+        similarity = (np.stack([self._signatures[i] for i in ids]) == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.threshold:
+            return None
+        entry = self._entries[ids[best]]
+        logger.info("Reusing script for %s (similarity %.2f)", entry["pet_name"], similarity[best])
+        return self._adapt(entry, request.pet_name, float(similarity[best]))
+
+    def add(self, request: StoryRequest, response: StoryResponse) -> None:
+        tokens = self._tokens(request)
+        if len(tokens) < MIN_TOKENS:
+            return
+        entry = {
+            "pet_name": request.pet_name,
+            "prompt_style": request.prompt_style,
+            "numbers": self._numbers(tokens),
+            "signature": self._signature(tokens).tolist(),
+            "response": response.model_dump(mode="json"),
+        }
+        with self._lock:
+            self._index(entry)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as stream:
+                stream.write(json.dumps(entry) + "\n")
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with self.path.open("r", encoding="utf-8") as stream:
+            for line in stream:
+                try:
+                    self._index(json.loads(line))
+                except (ValueError, KeyError):
+                    logger.warning("Skipping corrupt story index line in %s", self.path)
+
+    def _index(self, entry: dict) -> None:
+        signature = np.asarray(entry["signature"], dtype=np.int64)
+        entry_id = len(self._entries)
+        self._entries.append(entry)
+        self._signatures.append(signature)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[(entry["prompt_style"], band, key)].append(entry_id)
+
+    @staticmethod
+    def _tokens(request: StoryRequest) -> List[str]:
+        text = f"{request.bio} {' '.join(sorted(t.lower() for t in request.traits))}".lower()
+        text = re.sub(rf"\b{re.escape(request.pet_name.lower())}\b", PET_PLACEHOLDER, text)
+        return re.findall(r"[a-z0-9<>']+", text)
+
+    @staticmethod
+    def _numbers(tokens: List[str]) -> List[str]:
+        return sorted({number for token in tokens for number in NUMBER.findall(token)})
+
+    def _signature(self, tokens: List[str]) -> np.ndarray:
+        shingles = {" ".join(tokens[i : i + 3]) for i in range(max(1, len(tokens) - 2))}
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") for s in shingles),
+            dtype=np.int64,
+            count=len(shingles),
+        ) % MERSENNE_PRIME
+        a, b = self._perms
+        # (num_perm x shingles) universal hashes, minimum per permutation
+        return ((a[:, None] * hashes[None, :] + b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray) -> List[bytes]:
+        return [signature[band * ROWS : (band + 1) * ROWS].tobytes() for band in range(BANDS)]
+
+    @staticmethod
+    def _adapt(entry: dict, pet_name: str, similarity: float) -> Optional[StoryResponse]:
+        old_name = re.escape(entry["pet_name"])
+        word = re.compile(rf"\b{old_name}\b", re.IGNORECASE)
+        # hashtags glue the name to other words ("#AdoptLuna"), so no word boundaries inside them
+        hashtag = re.compile(r"#\w+")
+        glued = re.compile(old_name, re.IGNORECASE)
+        hashtag_name = pet_name.replace(" ", "")
+
+        def swap(value):
+            if isinstance(value, str):
+                value = hashtag.sub(lambda tag: glued.sub(hashtag_name, tag.group()), value)
+                return word.sub(pet_name, value)
+            if isinstance(value, list):
+                return [swap(item) for item in value]
+            return value
+
+        adapted = {key: value for key, value in entry["response"].items() if key not in ("storyboard", "palette")}
+        for key in TEXT_FIELDS:
+            if key != "hashtags":
+                adapted[key] = swap(adapted.get(key))
+        # hashtag entries may be stored without the leading "#", so substitute the whole tag
+        adapted["hashtags"] = [glued.sub(hashtag_name, tag).replace(" ", "") for tag in adapted["hashtags"]]
+
+        # the old name glued into plain text ("LunaBear") would leak into the new pet's video
+        text = json.dumps([adapted[key] for key in TEXT_FIELDS], ensure_ascii=False)
+        leftover = text.replace(pet_name, "").replace(hashtag_name, "")
+        if entry["pet_name"] in leftover or word.search(leftover):
+            logger.info("Not reusing script for %s: old name still present after substitution", entry["pet_name"])
+            return None
+        adapted["pet_name"] = pet_name
+        adapted["provider_results"] = [
+            ModelChoice(
+                model=f"cache:{entry['pet_name']}@{similarity:.2f}",
+                latency_ms=0,
+                cost_usd=0.0,
+                content=adapted["script"],
+            )
+        ]
+        return StoryResponse(**adapted)
+
+
+def get_story_index() -> StoryIndex:
+    return StoryIndex()
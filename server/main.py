@@ -1,8 +1,6 @@
 import uvicorn
 
-from app.main import create_app
-
-app = create_app()
+from app.main import app
 
 
 if __name__ == "__main__":
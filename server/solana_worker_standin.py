@@ -0,0 +1,71 @@
+"""Local stand-in for the Solana mint worker.
+
+Implements the two endpoints ``SolanaClient`` talks to, returning deterministic fake signatures
+instead of touching a chain:
+
+    POST /mint         {"adopter", "petId", "campaignId"}  -> {"ok": true, "signature": ...}
+    POST /mint/batch   {"mints": [...]}                    -> {"results": [...]}
+
+Run it next to the API and point the client at it:
+
+    python solana_worker_standin.py
+    SOLANA_WORKER_URL=http://127.0.0.1:8787/mint \\
+    SOLANA_WORKER_BATCH_URL=http://127.0.0.1:8787/mint/batch MOCK_MODE=false python main.py
+
+or in-process with ``get_solana_client(httpx.ASGITransport(app=app))``. ``GET /stats`` reports
+how many calls and mints the worker has seen, which is what the batching is meant to reduce.
+"""
+import asyncio
+import hashlib
+import os
+from typing import List, Optional
+
+import uvicorn
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+LATENCY_MS = float(os.getenv("STANDIN_LATENCY_MS", "0"))
+
+app = FastAPI(title="Solana worker stand-in")
+stats = {"calls": 0, "batch_calls": 0, "mints": 0}
+
+
+class Mint(BaseModel):
+    adopter: str
+    petId: str
+    campaignId: Optional[str] = None
+
+
+class MintBatch(BaseModel):
+    mints: List[Mint]
+
+
+def _sign(mint: Mint) -> dict:
+    digest = hashlib.sha256(f"{mint.adopter}|{mint.petId}|{mint.campaignId or ''}".encode()).hexdigest()
+    return {"ok": True, "signature": f"STANDIN-{digest[:32]}"}
+
+
+@app.post("/mint")
+async def mint(payload: Mint) -> dict:
+    stats["calls"] += 1
+    stats["mints"] += 1
+    await asyncio.sleep(LATENCY_MS / 1000)
+    return _sign(payload)
+
+
+@app.post("/mint/batch")
+async def mint_batch(payload: MintBatch) -> dict:
+    stats["calls"] += 1
+    stats["batch_calls"] += 1
+    stats["mints"] += len(payload.mints)
+    await asyncio.sleep(LATENCY_MS / 1000)
+    return {"results": [_sign(mint) for mint in payload.mints]}
+
+
+@app.get("/stats")
+async def get_stats() -> dict:
+    return stats
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port=int(os.getenv("STANDIN_PORT", "8787")))